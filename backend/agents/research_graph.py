@@ -1,19 +1,38 @@
 import time
 import logging
-from typing import TypedDict, Optional
+import operator
+import threading
+from typing import Annotated, TypedDict, Optional
 from langgraph.graph import StateGraph, START, END
 try:
-    from search.duckduckgo_client import search_news, search_culture, search_tech, search_interviews, search_financials, process_results
-    from chains.report_generator import generate_report
+    from search.duckduckgo_client import asearch_news, asearch_culture, asearch_tech, asearch_interviews, asearch_financials, process_records
+    from chains.report_generator import agenerate_report, aupdate_report
+    from core.concurrency import run_blocking
+    from core.metrics import NODE_SECONDS
+    from rag.embeddings import embed_search_records, record_category_refresh
+    from search.dedup import canonicalize_url
+    from chains.report_cache import corpus_fingerprint, get_report_store
     from schemas.report import CompanyReport
 except ModuleNotFoundError:
-    from backend.search.duckduckgo_client import search_news, search_culture, search_tech, search_interviews, search_financials, process_results
-    from backend.chains.report_generator import generate_report
+    from backend.search.duckduckgo_client import asearch_news, asearch_culture, asearch_tech, asearch_interviews, asearch_financials, process_records
+    from backend.chains.report_generator import agenerate_report, aupdate_report
+    from backend.core.concurrency import run_blocking
+    from backend.core.metrics import NODE_SECONDS
+    from backend.rag.embeddings import embed_search_records, record_category_refresh
+    from backend.search.dedup import canonicalize_url
+    from backend.chains.report_cache import corpus_fingerprint, get_report_store
     from backend.schemas.report import CompanyReport
 
 logger = logging.getLogger(__name__)
 
 
+def _elapsed(node: str, t0: float) -> float:
+    """Record a node's latency histogram sample and return it rounded for stage_timings."""
+    elapsed = time.time() - t0
+    NODE_SECONDS.labels(node).observe(elapsed)
+    return round(elapsed, 2)
+
+
 class ResearchState(TypedDict):
     company_name: str
     news_results: list
@@ -22,72 +41,123 @@ class ResearchState(TypedDict):
     interview_results: list
     financials_results: list
     all_results: list
+    # Deduplicated results with provenance (text, title, url, category), in all_results order.
+    all_records: list
+    aggregation_stats: dict
+    # Per-node wall-clock seconds; merged across parallel branches.
+    stage_timings: Annotated[dict, operator.or_]
+    chunks_embedded: int
+    ingest_error: Optional[str]
+    corpus_fingerprint: str
+    force_refresh: bool
     report: Optional[CompanyReport]
+    # Incremental refresh: the search nodes to run (all when empty), the stored
+    # records of every other category, and the report whose unaffected
+    # sections are kept.
+    search_nodes: list
+    base_records: list
+    base_report: Optional[CompanyReport]
+    # Categories whose results this run fetched from the network rather than
+    # the search cache; only these are marked fresh after ingestion.
+    fetched_categories: Annotated[list, operator.add]
+
+
+def _use_search_cache(state: ResearchState) -> bool:
+    """Forced rebuilds and category refreshes must see new results, not cached ones."""
+    return not (state.get("force_refresh") or state.get("search_nodes"))
+
+
+def _fetched(node: str, results: list[dict]) -> list[str]:
+    """The node's category if its results all came from the network, else nothing."""
+    if results and not any(r.get("from_cache") for r in results):
+        return [SEARCH_NODE_CATEGORIES[node]]
+    return []
 
 
-def news_node(state: ResearchState) -> ResearchState:
+async def news_node(state: ResearchState) -> ResearchState:
     company = state["company_name"]
-    print(f"[news_node] Searching news for: {company}")
     t0 = time.time()
-    results = search_news(company)
-    elapsed = round(time.time() - t0, 2)
+    results = await asearch_news(company, use_cache=_use_search_cache(state))
+    elapsed = _elapsed("news", t0)
     if not results:
-        logger.warning("[news_node] No results returned for '%s' — continuing", company)
-    print(f"[news_node] Found {len(results)} results in {elapsed}s")
-    time.sleep(1)
-    return {**state, "news_results": results}
+        logger.warning("node=%s company=%r event=no_results", "news", company)
+    logger.info("node=%s company=%r results=%d elapsed_s=%.2f", "news", company, len(results), elapsed)
+    return {
+        "news_results": results,
+        "fetched_categories": _fetched("news", results),
+        "stage_timings": {"news": elapsed},
+    }
 
 
-def culture_node(state: ResearchState) -> ResearchState:
+async def culture_node(state: ResearchState) -> ResearchState:
     company = state["company_name"]
-    print(f"[culture_node] Searching culture for: {company}")
     t0 = time.time()
-    results = search_culture(company)
-    elapsed = round(time.time() - t0, 2)
+    results = await asearch_culture(company, use_cache=_use_search_cache(state))
+    elapsed = _elapsed("culture", t0)
     if not results:
-        logger.warning("[culture_node] No results returned for '%s' — continuing", company)
-    print(f"[culture_node] Found {len(results)} results in {elapsed}s")
-    time.sleep(1)
-    return {**state, "culture_results": results}
+        logger.warning("node=%s company=%r event=no_results", "culture", company)
+    logger.info("node=%s company=%r results=%d elapsed_s=%.2f", "culture", company, len(results), elapsed)
+    return {
+        "culture_results": results,
+        "fetched_categories": _fetched("culture", results),
+        "stage_timings": {"culture": elapsed},
+    }
 
 
-def tech_node(state: ResearchState) -> ResearchState:
+async def tech_node(state: ResearchState) -> ResearchState:
     company = state["company_name"]
-    print(f"[tech_node] Searching tech stack for: {company}")
     t0 = time.time()
-    results = search_tech(company)
-    elapsed = round(time.time() - t0, 2)
+    results = await asearch_tech(company, use_cache=_use_search_cache(state))
+    elapsed = _elapsed("tech", t0)
     if not results:
-        logger.warning("[tech_node] No results returned for '%s' — continuing", company)
-    print(f"[tech_node] Found {len(results)} results in {elapsed}s")
-    time.sleep(1)
-    return {**state, "tech_results": results}
+        logger.warning("node=%s company=%r event=no_results", "tech", company)
+    logger.info("node=%s company=%r results=%d elapsed_s=%.2f", "tech", company, len(results), elapsed)
+    return {
+        "tech_results": results,
+        "fetched_categories": _fetched("tech", results),
+        "stage_timings": {"tech": elapsed},
+    }
 
 
-def interview_node(state: ResearchState) -> ResearchState:
+async def interview_node(state: ResearchState) -> ResearchState:
     company = state["company_name"]
-    print(f"[interview_node] Searching interviews for: {company}")
     t0 = time.time()
-    results = search_interviews(company)
-    elapsed = round(time.time() - t0, 2)
+    results = await asearch_interviews(company, use_cache=_use_search_cache(state))
+    elapsed = _elapsed("interview", t0)
     if not results:
-        logger.warning("[interview_node] No results returned for '%s' — continuing", company)
-    print(f"[interview_node] Found {len(results)} results in {elapsed}s")
-    time.sleep(1)
-    return {**state, "interview_results": results}
+        logger.warning("node=%s company=%r event=no_results", "interview", company)
+    logger.info("node=%s company=%r results=%d elapsed_s=%.2f", "interview", company, len(results), elapsed)
+    return {
+        "interview_results": results,
+        "fetched_categories": _fetched("interview", results),
+        "stage_timings": {"interview": elapsed},
+    }
 
 
-def financials_node(state: ResearchState) -> ResearchState:
+async def financials_node(state: ResearchState) -> ResearchState:
     company = state["company_name"]
-    print(f"[financials_node] Searching financials for: {company}")
     t0 = time.time()
-    results = search_financials(company)
-    elapsed = round(time.time() - t0, 2)
+    results = await asearch_financials(company, use_cache=_use_search_cache(state))
+    elapsed = _elapsed("financials", t0)
     if not results:
-        logger.warning("[financials_node] No results returned for '%s' — continuing", company)
-    print(f"[financials_node] Found {len(results)} results in {elapsed}s")
-    time.sleep(1)
-    return {**state, "financials_results": results}
+        logger.warning("node=%s company=%r event=no_results", "financials", company)
+    logger.info("node=%s company=%r results=%d elapsed_s=%.2f", "financials", company, len(results), elapsed)
+    return {
+        "financials_results": results,
+        "fetched_categories": _fetched("financials", results),
+        "stage_timings": {"financials": elapsed},
+    }
+
+
+def _merge_records(base_records: list[dict], records: list[dict]) -> list[dict]:
+    """Stored records of the categories not fetched anew, then the fresh ones they don't already cover."""
+    seen_urls = {canonicalize_url(r.get("url") or "") for r in base_records} - {""}
+    seen_texts = {r["text"] for r in base_records}
+    fresh = [
+        r for r in records
+        if r["text"] not in seen_texts and canonicalize_url(r.get("url") or "") not in seen_urls
+    ]
+    return list(base_records) + fresh
 
 
 def aggregator_node(state: ResearchState) -> ResearchState:
@@ -98,20 +168,121 @@ def aggregator_node(state: ResearchState) -> ResearchState:
         + state["interview_results"]
         + state["financials_results"]
     )
-    print(f"[aggregator_node] Combining {len(combined)} total results")
-    processed = process_results(combined)
-    print(f"[aggregator_node] {len(processed)} unique chunks after processing")
-    return {**state, "all_results": processed}
+    t0 = time.time()
+    records, dedup_stats = process_records(combined)
+    # A refreshed category whose search failed or came back empty keeps its
+    # stored records; only categories fetched anew replace theirs.
+    fetched = set(state.get("fetched_categories") or [])
+    base_records = [r for r in state.get("base_records") or [] if r["category"] not in fetched]
+    if base_records:
+        records = _merge_records(base_records, records)
+    processed = [r["text"] for r in records]
+    elapsed = _elapsed("aggregator", t0)
+    logger.info(
+        "node=aggregator company=%r results=%d kept=%d unique=%d url_duplicates=%d near_duplicates=%d elapsed_s=%.2f",
+        state["company_name"], len(combined), len(base_records), len(processed),
+        dedup_stats["url_duplicates"], dedup_stats["near_duplicates"], elapsed,
+    )
+    return {
+        "all_results": processed,
+        "all_records": records,
+        "aggregation_stats": {
+            "total_results": len(combined),
+            "empty_results": dedup_stats["empty"],
+            "url_duplicates": dedup_stats["url_duplicates"],
+            "near_duplicates": dedup_stats["near_duplicates"],
+            "unique_chunks": len(processed),
+        },
+        "stage_timings": {"aggregator": elapsed},
+    }
+
+
+async def ingest_node(state: ResearchState) -> ResearchState:
+    """Sync the processed results into the company's vector namespace.
+
+    Runs before report generation so the generator reads this run's corpus.
+    On an incremental refresh the synced set is the merged corpus, so chunks
+    of the refreshed categories are replaced and all others are left in place.
+    The categories fetched from the network are then marked fresh; ones
+    served from the search cache or left empty by a failed search keep their
+    old timestamp. A vector store failure is recorded in state instead of
+    aborting the graph.
+    """
+    company = state["company_name"]
+    if not state["all_results"]:
+        return {"chunks_embedded": 0, "ingest_error": None}
+    t0 = time.time()
+    try:
+        count = await run_blocking(embed_search_records, company, state["all_records"])
+        await run_blocking(record_category_refresh, company, state.get("fetched_categories") or [])
+    except Exception as e:
+        _elapsed("ingest", t0)
+        logger.error("node=ingest company=%r event=sync_failed error=%r", company, e)
+        return {"chunks_embedded": 0, "ingest_error": str(e)}
+    elapsed = _elapsed("ingest", t0)
+    logger.info("node=ingest company=%r chunks=%d elapsed_s=%.2f", company, count, elapsed)
+    return {"chunks_embedded": count, "ingest_error": None, "stage_timings": {"ingest": elapsed}}
 
 
-def report_generator_node(state: ResearchState) -> ResearchState:
+async def report_generator_node(state: ResearchState) -> ResearchState:
     company = state["company_name"]
-    print(f"[report_generator_node] Generating structured report for: {company}")
     t0 = time.time()
-    report = generate_report(company, state["all_results"])
-    elapsed = round(time.time() - t0, 2)
-    print(f"[report_generator_node] Report generated in {elapsed}s")
-    return {**state, "report": report}
+    fingerprint = corpus_fingerprint(state["all_results"])
+    cached = None
+    if not state.get("force_refresh"):
+        cached = await run_blocking(get_report_store().get_by_fingerprint, company, fingerprint)
+    if cached is not None:
+        elapsed = _elapsed("report_generator", t0)
+        logger.info("node=report_generator company=%r event=corpus_unchanged elapsed_s=%.2f", company, elapsed)
+        return {
+            "corpus_fingerprint": fingerprint,
+            "report": cached,
+            "stage_timings": {"report_generator": elapsed},
+        }
+    base_report = state.get("base_report")
+    if base_report is not None and not state.get("force_refresh"):
+        categories = refreshed_categories(state)
+        report = await aupdate_report(company, base_report, categories, state["all_results"])
+        elapsed = _elapsed("report_generator", t0)
+        logger.info(
+            "node=report_generator company=%r event=updated categories=%s elapsed_s=%.2f",
+            company, ",".join(categories), elapsed,
+        )
+        return {
+            "corpus_fingerprint": fingerprint,
+            "report": report,
+            "stage_timings": {"report_generator": elapsed},
+        }
+    report = await agenerate_report(company, state["all_results"])
+    elapsed = _elapsed("report_generator", t0)
+    logger.info("node=report_generator company=%r event=generated elapsed_s=%.2f", company, elapsed)
+    return {
+        "corpus_fingerprint": fingerprint,
+        "report": report,
+        "stage_timings": {"report_generator": elapsed},
+    }
+
+
+SEARCH_NODES = ("news", "culture", "tech", "interview", "financials")
+# Research category each search node tags its results with.
+SEARCH_NODE_CATEGORIES = {
+    "news": "news",
+    "culture": "culture",
+    "tech": "tech",
+    "interview": "interviews",
+    "financials": "financials",
+}
+
+
+def refreshed_categories(state: ResearchState) -> list[str]:
+    """Categories whose results this run fetched from the network, in SEARCH_NODES order."""
+    fetched = set(state.get("fetched_categories") or [])
+    return [category for category in SEARCH_NODE_CATEGORIES.values() if category in fetched]
+
+
+def route_searches(state: ResearchState) -> list[str]:
+    """Search nodes to fan out to: only the stale ones on an incremental refresh."""
+    return list(state.get("search_nodes") or SEARCH_NODES)
 
 
 def build_graph():
@@ -123,17 +294,36 @@ def build_graph():
     graph.add_node("interview", interview_node)
     graph.add_node("financials", financials_node)
     graph.add_node("aggregator", aggregator_node)
+    graph.add_node("ingest", ingest_node)
     graph.add_node("report_generator", report_generator_node)
 
-    graph.add_edge(START, "news")
-    graph.add_edge("news", "culture")
-    graph.add_edge("culture", "tech")
-    graph.add_edge("tech", "interview")
-    graph.add_edge("interview", "financials")
-    graph.add_edge("financials", "aggregator")
-    graph.add_edge("aggregator", "report_generator")
+    # Fan out: the selected search nodes (all of them unless this is an
+    # incremental refresh) start from START and run in the same superstep.
+    # Outbound calls are throttled by the shared search rate limiter rather
+    # than fixed sleeps, so wall-clock time tracks the slowest category.
+    # Nodes are coroutines, so the compiled graph is driven with ainvoke/astream.
+    graph.add_conditional_edges(START, route_searches, list(SEARCH_NODES))
+    # Fan in: the search nodes that ran all finish in one superstep, so the
+    # aggregator runs once, in the next, with every result written.
+    for node in SEARCH_NODES:
+        graph.add_edge(node, "aggregator")
+    graph.add_edge("aggregator", "ingest")
+    graph.add_edge("ingest", "report_generator")
     graph.add_edge("report_generator", END)
 
     app = graph.compile()
     return app
 
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_research_graph():
+    """The compiled research graph, built once on first use."""
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = build_graph()
+    return _graph
@@ -0,0 +1,297 @@
+"""Local stand-ins for Tavily search and the OpenAI chat and embeddings APIs.
+
+Responses are deterministic for a given request, so benchmark runs are
+comparable; latency and failure rate are injected per service. Run it
+standalone to benchmark a separately started server:
+
+    python -m bench.fake_services --port 8900
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import socket
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_WORDS = (
+    "platform revenue engineers customers growth cloud product teams launch hiring "
+    "culture remote funding market infrastructure security data analytics mobile "
+    "partners enterprise pricing roadmap research leadership acquisition quarterly "
+    "interview onsite coding design values mission benefits latency scale developers"
+).split()
+
+
+@dataclass
+class ServiceProfile:
+    """Injected behaviour of one fake service."""
+
+    latency_ms: float = 0.0
+    # Extra delay drawn uniformly from [0, jitter_ms] per request.
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+
+    async def apply(self, rng: random.Random):
+        """Sleep for the configured latency; return an error response or None."""
+        delay = self.latency_ms + rng.uniform(0, self.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+        if self.error_rate and rng.random() < self.error_rate:
+            return JSONResponse({"error": {"message": "injected failure"}}, status_code=self.error_status)
+        return None
+
+
+@dataclass
+class FakeServiceConfig:
+    search: ServiceProfile = field(default_factory=lambda: ServiceProfile(latency_ms=300, jitter_ms=200))
+    chat: ServiceProfile = field(default_factory=lambda: ServiceProfile(latency_ms=800, jitter_ms=400))
+    embeddings: ServiceProfile = field(default_factory=lambda: ServiceProfile(latency_ms=80, jitter_ms=40))
+    embedding_dim: int = 1536
+    seed: int = 0
+
+
+def _seeded(*parts) -> random.Random:
+    digest = hashlib.sha256("\x1f".join(map(str, parts)).encode("utf-8")).digest()
+    return random.Random(int.from_bytes(digest[:8], "little"))
+
+
+def _paragraph(rng: random.Random, topic: str, sentences: int = 4) -> str:
+    return " ".join(
+        f"{topic} {' '.join(rng.choices(_WORDS, k=rng.randint(8, 16)))}." for _ in range(sentences)
+    )
+
+
+def _search_response(query: str, max_results: int) -> dict:
+    results = []
+    for i in range(max_results):
+        rng = _seeded("search", query, i)
+        results.append({
+            "title": f"{query.title()} ({i + 1})",
+            "url": f"https://bench.example/{hashlib.sha1(query.encode()).hexdigest()[:10]}/{i}",
+            "content": _paragraph(rng, query.split()[0]),
+            "score": round(1 - i / (max_results + 1), 3),
+        })
+    return {"query": query, "results": results, "response_time": 0.0}
+
+
+def _embedding(text: str, dim: int) -> list[float]:
+    """Deterministic unit vector for a text."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dim, dtype=np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def _instance(schema: dict, defs: dict, rng: random.Random):
+    """A minimal value satisfying a JSON schema (objects, arrays, scalars, $ref, anyOf)."""
+    if "$ref" in schema:
+        return _instance(defs[schema["$ref"].rsplit("/", 1)[-1]], defs, rng)
+    if "anyOf" in schema:
+        options = [s for s in schema["anyOf"] if s.get("type") != "null"] or schema["anyOf"]
+        return _instance(options[0], defs, rng)
+    kind = schema.get("type", "string")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {name: _instance(prop, defs, rng) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [_instance(schema.get("items", {}), defs, rng) for _ in range(3)]
+    if kind == "integer":
+        return rng.randint(1, 100)
+    if kind == "number":
+        return round(rng.uniform(1, 100), 2)
+    if kind == "boolean":
+        return True
+    if kind == "null":
+        return None
+    if "enum" in schema:
+        return schema["enum"][0]
+    return _paragraph(rng, "Benchmark", sentences=2)
+
+
+def _chat_reply(body: dict, rng: random.Random) -> tuple[str, list]:
+    """Reply content and tool calls for a chat completion request."""
+    prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        schema = response_format["json_schema"]["schema"]
+        return json.dumps(_instance(schema, schema.get("$defs", {}), rng)), []
+    if body.get("tools"):
+        function = body["tools"][0]["function"]
+        schema = function.get("parameters", {})
+        arguments = json.dumps(_instance(schema, schema.get("$defs", {}), rng))
+        call = {"id": f"call_{uuid.uuid4().hex[:12]}", "type": "function",
+                "function": {"name": function["name"], "arguments": arguments}}
+        return "", [call]
+    if "Reply with only YES or NO" in prompt:
+        return "YES", []
+    return _paragraph(rng, "Answer", sentences=3), []
+
+
+def _usage(body: dict, content: str) -> dict:
+    prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+    completion_tokens = max(1, len(content) // 4)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def create_app(config: FakeServiceConfig) -> FastAPI:
+    app = FastAPI(title="Benchmark service stand-ins")
+    rng = random.Random(config.seed)
+
+    @app.post("/search")
+    async def tavily_search(request: Request):
+        body = await request.json()
+        error = await config.search.apply(rng)
+        if error is not None:
+            return error
+        return _search_response(body.get("query", ""), int(body.get("max_results", 5)))
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        error = await config.chat.apply(rng)
+        if error is not None:
+            return error
+        content, tool_calls = _chat_reply(body, _seeded("chat", json.dumps(body.get("messages"), sort_keys=True)))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model", "gpt-4o-mini")
+        usage = _usage(body, content)
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream_chunks(completion_id, created, model, content, usage, body), media_type="text/event-stream"
+            )
+        message = {"role": "assistant", "content": content or None}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": message,
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+            }],
+            "usage": usage,
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        error = await config.embeddings.apply(rng)
+        if error is not None:
+            return error
+        texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        return {
+            "object": "list",
+            "data": [
+                {"object": "embedding", "index": i, "embedding": _embedding(text, config.embedding_dim)}
+                for i, text in enumerate(texts)
+            ],
+            "model": body.get("model", "text-embedding-3-small"),
+            "usage": {"prompt_tokens": sum(len(t) for t in texts) // 4, "total_tokens": sum(len(t) for t in texts) // 4},
+        }
+
+    return app
+
+
+async def _stream_chunks(completion_id: str, created: int, model: str, content: str, usage: dict, body: dict):
+    base = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model}
+    words = content.split(" ")
+    for i, word in enumerate(words):
+        delta = {"content": word if i == 0 else f" {word}"}
+        if i == 0:
+            delta["role"] = "assistant"
+        yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}]})}\n\n"
+    yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})}\n\n"
+    if (body.get("stream_options") or {}).get("include_usage"):
+        yield f"data: {json.dumps({**base, 'choices': [], 'usage': usage})}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class FakeServices:
+    """Runs the stand-in app on a local port in a background thread.
+
+    Used as a context manager; `base_url` is valid inside the block.
+    """
+
+    def __init__(self, config: FakeServiceConfig, port: int = 0):
+        self.config = config
+        self.port = port or _free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self._server = uvicorn.Server(
+            uvicorn.Config(create_app(config), host="127.0.0.1", port=self.port, log_level="warning")
+        )
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> "FakeServices":
+        self._thread.start()
+        deadline = time.time() + 10
+        while not self._server.started:
+            if time.time() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Fake services failed to start")
+            time.sleep(0.02)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = FakeServiceConfig()
+    for name in ("search", "chat", "embeddings"):
+        profile = getattr(defaults, name)
+        parser.add_argument(f"--{name}-latency-ms", type=float, default=profile.latency_ms)
+        parser.add_argument(f"--{name}-jitter-ms", type=float, default=profile.jitter_ms)
+        parser.add_argument(f"--{name}-error-rate", type=float, default=profile.error_rate)
+        parser.add_argument(f"--{name}-error-status", type=int, default=profile.error_status)
+    parser.add_argument("--embedding-dim", type=int, default=defaults.embedding_dim)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_args(args: argparse.Namespace) -> FakeServiceConfig:
+    def profile(name: str) -> ServiceProfile:
+        return ServiceProfile(
+            latency_ms=getattr(args, f"{name}_latency_ms"),
+            jitter_ms=getattr(args, f"{name}_jitter_ms"),
+            error_rate=getattr(args, f"{name}_error_rate"),
+            error_status=getattr(args, f"{name}_error_status"),
+        )
+
+    return FakeServiceConfig(
+        search=profile("search"),
+        chat=profile("chat"),
+        embeddings=profile("embeddings"),
+        embedding_dim=args.embedding_dim,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8900)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(config_from_args(args)), host="127.0.0.1", port=args.port, log_level="warning")
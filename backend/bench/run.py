@@ -0,0 +1,298 @@
+"""Offline load test for /research, /generate-report and /chat.
+
+Starts the local service stand-ins from bench.fake_services, points the app
+at them, drives one endpoint at a fixed concurrency and reports latency
+percentiles, throughput and a per-stage breakdown taken from /metrics.
+Results are saved under bench/results/ so runs can be compared:
+
+    cd backend
+    python -m bench.run --scenario generate-report --requests 200 --concurrency 20
+    python -m bench.run --scenario chat --compare bench/results/<earlier>.json
+
+With --target the load goes to an already running server instead; start it
+with TAVILY_BASE_URL and OPENAI_BASE_URL pointing at `python -m bench.fake_services`.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+from prometheus_client.parser import text_string_to_metric_families
+
+from .fake_services import FakeServices, add_profile_arguments, config_from_args
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+SCENARIOS = ("research", "generate-report", "chat")
+QUESTIONS = (
+    "What does the company build?",
+    "What is the engineering culture like?",
+    "Which technologies do they use?",
+    "How did revenue develop recently?",
+    "What is the interview process?",
+)
+# Histograms broken down per label set in the stage report.
+STAGE_HISTOGRAMS = {
+    "node": "research_node_duration_seconds",
+    "search": "search_query_duration_seconds",
+    "llm": "llm_call_duration_seconds",
+    "embedding": "embedding_batch_duration_seconds",
+    "retrieval": "vector_query_duration_seconds",
+}
+
+
+def _app_environment(fake_base_url: str, data_dir: str, args: argparse.Namespace) -> dict:
+    environment = {
+        "TAVILY": "bench",
+        "TAVILY_BASE_URL": fake_base_url,
+        "OPENAI_API_KEY": "bench",
+        "OPENAI_BASE_URL": f"{fake_base_url}/v1",
+        "EMBEDDING_BACKEND": args.embedding_backend,
+        "SEARCH_CACHE_ENABLED": "true" if args.search_cache else "false",
+        "CHROMA_PERSIST_DIR": os.path.join(data_dir, "chroma_db"),
+        "SEARCH_CACHE_PATH": os.path.join(data_dir, "search_cache.db"),
+        "EMBEDDING_CACHE_PATH": os.path.join(data_dir, "embedding_cache.db"),
+        "REPORT_CACHE_PATH": os.path.join(data_dir, "report_cache.db"),
+        "COMPANY_VALIDITY_CACHE_PATH": os.path.join(data_dir, "company_validity.db"),
+        "JOB_STORE_PATH": os.path.join(data_dir, "jobs.db"),
+        # Recording against the fakes must never touch the developer's cassette.
+        "CASSETTE_PATH": os.path.join(data_dir, "cassette.jsonl.gz"),
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+    }
+    if args.search_rate_limit:
+        environment["SEARCH_RATE_LIMIT_PER_S"] = str(args.search_rate_limit)
+        environment["SEARCH_RATE_LIMIT_BURST"] = str(max(1, int(args.search_rate_limit)))
+    return environment
+
+
+def _import_app(environment: dict):
+    """Import the FastAPI app with the benchmark environment applied.
+
+    Settings are read at import time, so this must run before anything else
+    imports the backend modules.
+    """
+    os.environ.update(environment)
+    import main
+
+    # Some modules load backend/.env with override=True; refuse to run against real services or data.
+    overridden = sorted(key for key, value in environment.items() if os.environ.get(key) != value)
+    if overridden:
+        raise SystemExit(f"backend/.env overrides benchmark settings: {', '.join(overridden)}")
+    return main.app, main.lifespan
+
+
+def _payload(scenario: str, i: int, companies: list[str], force_refresh: bool) -> dict:
+    company = companies[i % len(companies)]
+    question = QUESTIONS[i % len(QUESTIONS)]
+    if scenario == "research":
+        return {"company_name": company, "query": question}
+    if scenario == "generate-report":
+        return {"company_name": company, "force_refresh": force_refresh}
+    return {"company_name": company, "question": question}
+
+
+async def _scrape(client: httpx.AsyncClient) -> dict:
+    """{(metric, labels): (count, sum)} for the stage histograms."""
+    response = await client.get("/metrics")
+    response.raise_for_status()
+    wanted = set(STAGE_HISTOGRAMS.values())
+    series: dict = {}
+    for family in text_string_to_metric_families(response.text):
+        if family.name not in wanted:
+            continue
+        for sample in family.samples:
+            if sample.name.endswith(("_count", "_sum")):
+                key = (family.name, tuple(sorted(sample.labels.items())))
+                count, total = series.get(key, (0.0, 0.0))
+                if sample.name.endswith("_count"):
+                    count = sample.value
+                else:
+                    total = sample.value
+                series[key] = (count, total)
+    return series
+
+
+def _stage_breakdown(before: dict, after: dict) -> dict:
+    """Calls and mean latency per stage label set during the measured window."""
+    stages = {}
+    for stage, metric in STAGE_HISTOGRAMS.items():
+        rows = {}
+        for (name, labels), (count, total) in sorted(after.items()):
+            if name != metric:
+                continue
+            prior_count, prior_total = before.get((name, labels), (0.0, 0.0))
+            calls = count - prior_count
+            if calls:
+                label = ",".join(f"{k}={v}" for k, v in labels)
+                rows[label] = {"calls": int(calls), "mean_ms": round((total - prior_total) / calls * 1000, 1)}
+        if rows:
+            stages[stage] = rows
+    return stages
+
+
+async def _drive(client: httpx.AsyncClient, path: str, payloads: list[dict], concurrency: int) -> tuple[list, float]:
+    """Send the payloads with at most `concurrency` in flight; return samples and wall time."""
+    samples: list[tuple[float, int]] = []
+    pending = iter(payloads)
+
+    async def worker():
+        for payload in pending:
+            t0 = time.perf_counter()
+            try:
+                status = (await client.post(path, json=payload)).status_code
+            except httpx.HTTPError:
+                status = 0
+            samples.append((time.perf_counter() - t0, status))
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - t0
+
+
+def _summarize(samples: list, wall_s: float) -> dict:
+    latencies = np.array([s for s, _ in samples]) * 1000
+    statuses = Counter(str(status) for _, status in samples)
+    ok = sum(n for status, n in statuses.items() if status.startswith("2"))
+    return {
+        "requests": len(samples),
+        "ok": ok,
+        "errors": len(samples) - ok,
+        "status_codes": dict(sorted(statuses.items())),
+        "wall_s": round(wall_s, 3),
+        "throughput_rps": round(len(samples) / wall_s, 2) if wall_s else 0.0,
+        "latency_ms": {
+            "mean": round(float(latencies.mean()), 1),
+            "p50": round(float(np.percentile(latencies, 50)), 1),
+            "p95": round(float(np.percentile(latencies, 95)), 1),
+            "p99": round(float(np.percentile(latencies, 99)), 1),
+            "max": round(float(latencies.max()), 1),
+        },
+    }
+
+
+async def _run(args: argparse.Namespace, app=None, lifespan=None) -> dict:
+    companies = [f"{args.company_prefix} {i}" for i in range(args.companies)]
+    path = f"/{args.scenario}"
+    async with AsyncExitStack() as stack:
+        if args.target:
+            client = httpx.AsyncClient(base_url=args.target, timeout=args.timeout)
+        else:
+            await stack.enter_async_context(lifespan(app))
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=args.timeout)
+        await stack.enter_async_context(client)
+
+        if args.scenario == "chat":
+            # Chat answers from an existing corpus; build one per company first (unmeasured).
+            await _drive(client, "/generate-report", [{"company_name": c} for c in companies], args.concurrency)
+        if args.warmup:
+            warmup = [_payload(args.scenario, i, companies, args.force_refresh) for i in range(args.warmup)]
+            await _drive(client, path, warmup, args.concurrency)
+
+        before = await _scrape(client)
+        payloads = [_payload(args.scenario, i, companies, args.force_refresh) for i in range(args.requests)]
+        samples, wall_s = await _drive(client, path, payloads, args.concurrency)
+        after = await _scrape(client)
+
+    summary = _summarize(samples, wall_s)
+    summary["stages"] = _stage_breakdown(before, after)
+    return summary
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _print_report(result: dict, baseline: dict = None) -> None:
+    summary = result["summary"]
+    latency = summary["latency_ms"]
+    print(f"\n{result['config']['scenario']}: {summary['requests']} requests, "
+          f"concurrency {result['config']['concurrency']}, commit {result['git_commit']}")
+    print(f"  ok {summary['ok']}  errors {summary['errors']}  status {summary['status_codes']}")
+    print(f"  throughput {summary['throughput_rps']} req/s over {summary['wall_s']}s")
+    print("  latency ms  " + "  ".join(f"{k} {v}" for k, v in latency.items()))
+    if baseline is not None:
+        prior = baseline["summary"]
+        deltas = [
+            f"{k} {(latency[k] - prior['latency_ms'][k]) / prior['latency_ms'][k] * 100:+.1f}%"
+            for k in ("p50", "p95", "p99") if prior["latency_ms"].get(k)
+        ]
+        if prior.get("throughput_rps"):
+            change = (summary["throughput_rps"] - prior["throughput_rps"]) / prior["throughput_rps"] * 100
+            deltas.append(f"throughput {change:+.1f}%")
+        print(f"  vs {baseline['git_commit']}: " + "  ".join(deltas))
+    for stage, rows in summary["stages"].items():
+        print(f"  {stage}:")
+        for label, row in rows.items():
+            print(f"    {label:<48} {row['calls']:>6} calls  {row['mean_ms']:>9.1f} ms mean")
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=SCENARIOS, default="generate-report")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--companies", type=int, default=20, help="Distinct company names cycled through")
+    parser.add_argument("--company-prefix", default="Bench Co")
+    parser.add_argument("--warmup", type=int, default=0, help="Unmeasured requests sent first")
+    parser.add_argument("--force-refresh", action="store_true", help="Bypass the report cache in generate-report")
+    parser.add_argument("--search-cache", action="store_true", help="Leave the search cache enabled")
+    parser.add_argument("--embedding-backend", choices=("openai", "hashing"), default="openai")
+    parser.add_argument(
+        "--search-rate-limit", type=float, help="Override SEARCH_RATE_LIMIT_PER_S (the app default throttles to 5/s)"
+    )
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--target", help="Base URL of a running server to load instead of the in-process app")
+    parser.add_argument("--compare", help="Earlier results file to report deltas against")
+    parser.add_argument("--no-save", action="store_true")
+    add_profile_arguments(parser)
+    args = parser.parse_args(argv)
+
+    config = {k: v for k, v in vars(args).items() if k not in ("compare", "no_save")}
+    with tempfile.TemporaryDirectory(prefix="bench-") as data_dir:
+        if args.target:
+            summary = asyncio.run(_run(args))
+        else:
+            with FakeServices(config_from_args(args)) as fakes:
+                app, lifespan = _import_app(_app_environment(fakes.base_url, data_dir, args))
+                summary = asyncio.run(_run(args, app, lifespan))
+
+    result = {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "config": config,
+        "summary": summary,
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    _print_report(result, baseline)
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path = os.path.join(RESULTS_DIR, f"{stamp}-{args.scenario}.json")
+        with open(path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nSaved {path}")
+    return result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+try:
+    from core.keys import normalize_company_name
+    from core.metrics import record_cache_lookup
+except ModuleNotFoundError:
+    from backend.core.keys import normalize_company_name
+    from backend.core.metrics import record_cache_lookup
+
+CHAT_CACHE_ENABLED = os.getenv("CHAT_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+# Minimum cosine similarity between two questions' embeddings for the earlier
+# answer to be reused.
+CHAT_CACHE_SIMILARITY = float(os.getenv("CHAT_CACHE_SIMILARITY", "0.9"))
+CHAT_CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "2000"))
+
+
+@dataclass
+class AnswerProbe:
+    """A chat question, ready to look up and later store an answer for.
+
+    `corpus_version` identifies the ingestion of the company's namespace the
+    answer is grounded in; `category` is the retrieval filter, if any.
+    """
+
+    company_name: str
+    corpus_version: str
+    category: Optional[str]
+    question: str
+    vector: np.ndarray
+
+
+@dataclass
+class _Entry:
+    corpus_version: str
+    category: Optional[str]
+    question: str
+    vector: np.ndarray
+    answer: str
+
+
+def _unit(vector) -> np.ndarray:
+    v = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(v)
+    return v / norm if norm else v
+
+
+class SemanticAnswerCache:
+    """Per-company cache of /chat answers, matched by question similarity.
+
+    A question reuses an earlier answer for the same company and category
+    when their embeddings' cosine similarity reaches `threshold` and the
+    company's corpus has not been re-ingested since. Entries from an older
+    ingestion are dropped when the company is next looked up, and the least
+    recently used entries go first once `max_entries` is reached. Entries
+    live in process memory only.
+    """
+
+    def __init__(self, threshold: float = CHAT_CACHE_SIMILARITY, max_entries: int = CHAT_CACHE_MAX_ENTRIES):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # company key -> entry id -> entry; ids are recency-ordered in _lru.
+        self._companies: dict[str, dict[int, _Entry]] = {}
+        self._lru: OrderedDict[int, str] = OrderedDict()
+        self._next_id = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def probe(
+        self, company_name: str, corpus_version: str, category: Optional[str], question: str, vector
+    ) -> AnswerProbe:
+        return AnswerProbe(company_name, corpus_version, category, question, _unit(vector))
+
+    def _drop(self, key: str, entry_id: int) -> None:
+        entries = self._companies.get(key)
+        if entries is not None:
+            entries.pop(entry_id, None)
+            if not entries:
+                del self._companies[key]
+        self._lru.pop(entry_id, None)
+
+    def get(self, probe: AnswerProbe) -> Optional[str]:
+        """Answer to the most similar earlier question, or None below the threshold."""
+        key = normalize_company_name(probe.company_name)
+        best_id, best_score = None, self.threshold
+        with self._lock:
+            for entry_id, entry in list(self._companies.get(key, {}).items()):
+                if entry.corpus_version != probe.corpus_version:
+                    self._drop(key, entry_id)
+                    self._invalidations += 1
+                    continue
+                if entry.category != probe.category:
+                    continue
+                score = float(np.dot(entry.vector, probe.vector))
+                if score >= best_score:
+                    best_id, best_score = entry_id, score
+            if best_id is None:
+                self._misses += 1
+                answer = None
+            else:
+                self._hits += 1
+                self._lru.move_to_end(best_id)
+                answer = self._companies[key][best_id].answer
+        record_cache_lookup("chat_answer", hit=answer is not None)
+        return answer
+
+    def put(self, probe: AnswerProbe, answer: str) -> None:
+        key = normalize_company_name(probe.company_name)
+        entry = _Entry(probe.corpus_version, probe.category, probe.question, probe.vector, answer)
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._companies.setdefault(key, {})[entry_id] = entry
+            self._lru[entry_id] = key
+            while len(self._lru) > self.max_entries:
+                oldest_id, oldest_key = next(iter(self._lru.items()))
+                self._drop(oldest_key, oldest_id)
+                self._evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._lru),
+                "companies": len(self._companies),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> Optional[SemanticAnswerCache]:
+    """The process-wide answer cache, or None when CHAT_CACHE_ENABLED is off."""
+    global _cache
+    if not CHAT_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticAnswerCache()
+    return _cache
@@ -0,0 +1,119 @@
+import os
+import re
+from dataclasses import dataclass, field
+
+try:
+    from rag.bm25 import BM25Index
+    from core.tokens import count_tokens
+except ModuleNotFoundError:
+    from backend.rag.bm25 import BM25Index
+    from backend.core.tokens import count_tokens
+
+REPORT_CONTEXT_TOKEN_BUDGET = int(os.getenv("REPORT_CONTEXT_TOKEN_BUDGET", "12000"))
+# Two chunks whose word-trigram Jaccard similarity reaches this are near-duplicates.
+CONTEXT_DEDUP_THRESHOLD = float(os.getenv("CONTEXT_DEDUP_THRESHOLD", "0.8"))
+
+
+def _shingles(text: str) -> set[tuple[str, ...]]:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < 3:
+        return {tuple(words)}
+    return {tuple(words[i : i + 3]) for i in range(len(words) - 2)}
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class PackedContext:
+    chunks: list[str]
+    tokens_used: int
+    tokens_available: int
+    duplicates_dropped: int
+    per_field: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_available - self.tokens_used
+
+
+def pack_context(
+    chunks: list[str],
+    field_queries: dict[str, str],
+    budget: int = REPORT_CONTEXT_TOKEN_BUDGET,
+) -> PackedContext:
+    """Select the chunks that best cover every report field within a token budget.
+
+    Chunks are ranked per field with BM25 against that field's query, then
+    picked round-robin across fields so no section starves another. A chunk
+    that is a near-duplicate of one already picked is skipped. Chunks that
+    match no field fill whatever budget is left. The result keeps the
+    original chunk order.
+
+    Args:
+        chunks: Candidate context chunks.
+        field_queries: Report field name -> text describing what that field needs.
+        budget: Maximum total tokens of the packed chunks.
+    """
+    unique = list(dict.fromkeys(c for c in chunks if c and c.strip()))
+    tokens = [count_tokens(c) for c in unique]
+    shingles = [_shingles(c) for c in unique]
+    token_counts = dict(zip(unique, tokens))
+    available = sum(token_counts.get(c, 0) for c in chunks)
+
+    index = BM25Index([str(i) for i in range(len(unique))], unique)
+    rankings = {
+        name: [int(doc_id) for doc_id, _, _ in index.search(query, len(unique))]
+        for name, query in field_queries.items()
+    }
+    matched = {i for ranking in rankings.values() for i in ranking}
+    leftovers = [i for i in range(len(unique)) if i not in matched]
+
+    selected: list[int] = []
+    chosen: set[int] = set()
+    rejected: set[int] = set()
+    duplicates = 0
+    used = 0
+    per_field = {name: 0 for name in field_queries}
+
+    def try_take(i: int) -> bool:
+        nonlocal used, duplicates
+        if i in rejected or i in chosen:
+            return False
+        if used + tokens[i] > budget:
+            return False
+        if any(_jaccard(shingles[i], shingles[j]) >= CONTEXT_DEDUP_THRESHOLD for j in selected):
+            rejected.add(i)
+            duplicates += 1
+            return False
+        selected.append(i)
+        chosen.add(i)
+        used += tokens[i]
+        return True
+
+    cursors = {name: 0 for name in rankings}
+    progressing = True
+    while progressing:
+        progressing = False
+        for name, ranking in rankings.items():
+            while cursors[name] < len(ranking):
+                i = ranking[cursors[name]]
+                cursors[name] += 1
+                if try_take(i):
+                    per_field[name] += 1
+                    progressing = True
+                    break
+    for i in leftovers:
+        try_take(i)
+
+    selected.sort()
+    return PackedContext(
+        chunks=[unique[i] for i in selected],
+        tokens_used=used,
+        tokens_available=available,
+        duplicates_dropped=duplicates,
+        per_field=per_field,
+    )
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    from core.keys import normalize_company_name
+    from schemas.report import CompanyReport
+except ModuleNotFoundError:
+    from backend.core.keys import normalize_company_name
+    from backend.schemas.report import CompanyReport
+
+REPORT_CACHE_PATH = os.getenv("REPORT_CACHE_PATH", "./cache/report_cache.db")
+# Reports younger than this are served as-is.
+REPORT_CACHE_TTL_S = float(os.getenv("REPORT_CACHE_TTL_S", str(24 * 60 * 60)))
+# Reports older than the TTL but younger than this are served immediately
+# while a background refresh runs; older ones are regenerated inline.
+REPORT_CACHE_MAX_STALE_S = float(os.getenv("REPORT_CACHE_MAX_STALE_S", str(7 * 24 * 60 * 60)))
+
+
+def corpus_fingerprint(texts: list[str]) -> str:
+    """Order-independent hash of the processed search corpus behind a report."""
+    digest = hashlib.sha256()
+    for text in sorted(texts):
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@dataclass
+class CachedReport:
+    company_name: str
+    fingerprint: str
+    report: CompanyReport
+    # Processed search records behind the report: text plus url, title and
+    # category where known (reports stored before provenance have text only).
+    records: list[dict]
+    generated_at: float
+
+    @property
+    def sources(self) -> list[str]:
+        return [r["text"] for r in self.records]
+
+    @property
+    def age_s(self) -> float:
+        return time.time() - self.generated_at
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.age_s <= REPORT_CACHE_TTL_S
+
+    @property
+    def is_servable(self) -> bool:
+        return self.age_s <= REPORT_CACHE_MAX_STALE_S
+
+
+class ReportStore:
+    """Persistent store of the latest validated CompanyReport per company.
+
+    Rows are keyed by normalized company name and carry the fingerprint of the
+    source corpus the report was generated from, so an identical corpus can
+    reuse the stored report without another LLM call.
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._refreshing: set[str] = set()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS reports ("
+            " company_key TEXT PRIMARY KEY,"
+            " company_name TEXT NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " report TEXT NOT NULL,"
+            " sources TEXT NOT NULL,"
+            " generated_at REAL NOT NULL)"
+        )
+
+    def get(self, company_name: str) -> Optional[CachedReport]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT company_name, fingerprint, report, sources, generated_at"
+                " FROM reports WHERE company_key = ?",
+                (normalize_company_name(company_name),),
+            ).fetchone()
+        if row is None:
+            return None
+        name, fingerprint, report, sources, generated_at = row
+        return CachedReport(
+            company_name=name,
+            fingerprint=fingerprint,
+            report=CompanyReport.model_validate_json(report),
+            records=[r if isinstance(r, dict) else {"text": r} for r in json.loads(sources)],
+            generated_at=generated_at,
+        )
+
+    def get_by_fingerprint(self, company_name: str, fingerprint: str) -> Optional[CompanyReport]:
+        """Return the stored report only if it was built from the same corpus."""
+        cached = self.get(company_name)
+        if cached is None or cached.fingerprint != fingerprint:
+            return None
+        return cached.report
+
+    def put(self, company_name: str, fingerprint: str, report: CompanyReport, records: list[dict]) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO reports"
+                " (company_key, company_name, fingerprint, report, sources, generated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    normalize_company_name(company_name),
+                    company_name,
+                    fingerprint,
+                    report.model_dump_json(),
+                    json.dumps(records),
+                    time.time(),
+                ),
+            )
+
+    def touch(self, company_name: str) -> None:
+        """Re-stamp a stored report as just generated, e.g. after confirming its corpus is current."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE reports SET generated_at = ? WHERE company_key = ?",
+                (time.time(), normalize_company_name(company_name)),
+            )
+
+    def claim_refresh(self, company_name: str) -> bool:
+        """Mark a background refresh as running. False if one is already in flight."""
+        key = normalize_company_name(company_name)
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def release_refresh(self, company_name: str) -> None:
+        with self._lock:
+            self._refreshing.discard(normalize_company_name(company_name))
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+            refreshing = len(self._refreshing)
+        return {"entries": entries, "refreshing": refreshing}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_report_store() -> ReportStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ReportStore(REPORT_CACHE_PATH)
+    return _store
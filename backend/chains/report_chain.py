@@ -1,7 +1,21 @@
 import os
+from typing import AsyncIterator
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 
+try:
+    from chains.validity_cache import get_validity_cache
+    from core.cassette import llm_http_clients
+    from core.concurrency import run_blocking
+    from core.llm_metrics import LLMMetricsHandler
+    from core.rate_limit import get_llm_limiter
+except ModuleNotFoundError:
+    from backend.chains.validity_cache import get_validity_cache
+    from backend.core.cassette import llm_http_clients
+    from backend.core.concurrency import run_blocking
+    from backend.core.llm_metrics import LLMMetricsHandler
+    from backend.core.rate_limit import get_llm_limiter
+
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "../.env"), override=True)
 
 _llm = None
@@ -13,32 +27,53 @@ def _get_llm() -> ChatOpenAI:
         _llm = ChatOpenAI(
             model="gpt-4o-mini",
             api_key=os.getenv("OPENAI_API_KEY"),
+            # Report token usage on the final chunk of streamed answers too.
+            stream_usage=True,
+            callbacks=[LLMMetricsHandler("chat", "gpt-4o-mini")],
+            rate_limiter=get_llm_limiter(),
+            **llm_http_clients(),
         )
     return _llm
 
 
-def is_real_company(company_name: str) -> bool:
-    """Ask the LLM whether the given name is a real company."""
-    llm = _get_llm()
-    response = llm.invoke(
+def _validity_prompt(company_name: str) -> str:
+    return (
         f"Is '{company_name}' a real, identifiable company or organisation "
         f"(including startups, private companies, and nonprofits)? "
         f"Reply with only YES or NO."
     )
-    return response.content.strip().upper().startswith("YES")
 
 
-def answer_query(query: str, context: list[str], company_name: str = "") -> str:
-    """Generate an answer using OpenAI based on retrieved context chunks.
-
-    Args:
-        query: The user's question.
-        context: List of relevant document chunks from ChromaDB.
-        company_name: The company being researched (used to anchor the answer).
+def is_real_company(company_name: str) -> bool:
+    """Ask the LLM whether the given name is a real company.
 
-    Returns:
-        OpenAI's synthesized answer as a string.
+    Answers are memoized per normalized name (negative ones for a shorter
+    TTL), and companies with a generated report are recorded as real, so the
+    LLM is only asked about names seen for the first time.
     """
+    cache = get_validity_cache()
+    cached = cache.get(company_name)
+    if cached is not None:
+        return cached
+    response = _get_llm().invoke(_validity_prompt(company_name))
+    is_real = response.content.strip().upper().startswith("YES")
+    cache.set(company_name, is_real)
+    return is_real
+
+
+async def ais_real_company(company_name: str) -> bool:
+    """Async variant of is_real_company; cache reads and writes go through run_blocking."""
+    cache = get_validity_cache()
+    cached = await run_blocking(cache.get, company_name)
+    if cached is not None:
+        return cached
+    response = await _get_llm().ainvoke(_validity_prompt(company_name))
+    is_real = response.content.strip().upper().startswith("YES")
+    await run_blocking(cache.set, company_name, is_real)
+    return is_real
+
+
+def _build_answer_prompt(query: str, context: list[str], company_name: str = "") -> str:
     context_block = "\n\n".join(context)
     company_clause = f" about {company_name}" if company_name else ""
     no_info_reply = (
@@ -54,6 +89,38 @@ def answer_query(query: str, context: list[str], company_name: str = "") -> str:
         f"respond with exactly: \"{no_info_reply}\"\n"
         f"- Do NOT use general knowledge or information about other companies."
     )
+    return prompt
+
+
+def answer_query(query: str, context: list[str], company_name: str = "") -> str:
+    """Generate an answer using OpenAI based on retrieved context chunks.
+
+    Args:
+        query: The user's question.
+        context: List of relevant document chunks from ChromaDB.
+        company_name: The company being researched (used to anchor the answer).
+
+    Returns:
+        OpenAI's synthesized answer as a string.
+    """
     llm = _get_llm()
-    response = llm.invoke(prompt)
+    response = llm.invoke(_build_answer_prompt(query, context, company_name))
     return response.content
+
+
+async def aanswer_query(query: str, context: list[str], company_name: str = "") -> str:
+    """Async variant of answer_query."""
+    response = await _get_llm().ainvoke(_build_answer_prompt(query, context, company_name))
+    return response.content
+
+
+async def astream_answer(query: str, context: list[str], company_name: str = "") -> AsyncIterator[str]:
+    """Stream the answer_query completion token by token as the model produces it.
+
+    Cancelling the consuming task closes the underlying HTTP stream, so an
+    abandoned request stops generating (and billing) tokens.
+    """
+    llm = _get_llm()
+    async for chunk in llm.astream(_build_answer_prompt(query, context, company_name)):
+        if chunk.content:
+            yield chunk.content
@@ -1,18 +1,110 @@
+import asyncio
+import logging
 import os
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
+from pydantic import BaseModel, create_model
 
 try:
-    from rag.embeddings import get_collection
+    from rag.embeddings import get_collection, namespace_chunk_count
     from schemas.report import CompanyReport
+    from chains.context_packer import REPORT_CONTEXT_TOKEN_BUDGET, pack_context
+    from core.cassette import llm_http_clients
+    from core.concurrency import run_blocking
+    from core.llm_metrics import LLMMetricsHandler
+    from core.rate_limit import get_llm_limiter
 except ModuleNotFoundError:
-    from backend.rag.embeddings import get_collection
+    from backend.rag.embeddings import get_collection, namespace_chunk_count
     from backend.schemas.report import CompanyReport
+    from backend.chains.context_packer import REPORT_CONTEXT_TOKEN_BUDGET, pack_context
+    from backend.core.cassette import llm_http_clients
+    from backend.core.concurrency import run_blocking
+    from backend.core.llm_metrics import LLMMetricsHandler
+    from backend.core.rate_limit import get_llm_limiter
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "../.env"), override=True)
 
+logger = logging.getLogger(__name__)
+
+# "single" asks for the whole report in one structured-output call;
+# "sectioned" generates each section group concurrently and merges them.
+REPORT_MODE = os.getenv("REPORT_MODE", "single").lower()
+# Per-section token budget for focused context in sectioned mode.
+REPORT_SECTION_TOKEN_BUDGET = int(os.getenv("REPORT_SECTION_TOKEN_BUDGET", "4000"))
+# Extra attempts for a section whose call fails; other sections are kept.
+REPORT_SECTION_RETRIES = int(os.getenv("REPORT_SECTION_RETRIES", "2"))
+
+# Report fields generated together in sectioned mode.
+REPORT_SECTIONS = {
+    "overview": ("overview", "products_and_services", "recent_news"),
+    "culture": ("culture_and_values", "red_flags"),
+    "tech": ("tech_stack",),
+    "financials": ("financials",),
+    "interview": ("interview_process", "common_interview_questions", "preparation_tips"),
+}
+# Research categories whose chunks feed each section; sections not listed
+# (and sections whose categories yield nothing) see the whole corpus.
+REPORT_SECTION_CATEGORIES = {
+    "culture": ("culture", "news", "interviews"),
+    "tech": ("tech",),
+    "financials": ("financials",),
+    "interview": ("interviews",),
+}
+# Research categories whose refresh makes a stored section out of date. The
+# overview reads the whole corpus but only its recent news moves quickly.
+REPORT_SECTION_DEPENDENCIES = {
+    **REPORT_SECTION_CATEGORIES,
+    "overview": ("news",),
+}
+
 _llm = None
 
+# What each report field needs from the corpus, used to rank chunks per field
+# when packing the prompt context.
+REPORT_FIELD_QUERIES = {
+    name: f"{name.replace('_', ' ')} {info.description}"
+    for name, info in CompanyReport.model_fields.items()
+    if name != "company_name"
+}
+
+# Partial schemas, one per section, reusing CompanyReport's field definitions.
+_SECTION_MODELS: dict[str, type[BaseModel]] = {
+    section: create_model(
+        f"{section.title()}Section",
+        **{name: (CompanyReport.model_fields[name].annotation, CompanyReport.model_fields[name]) for name in fields},
+    )
+    for section, fields in REPORT_SECTIONS.items()
+}
+
+_FIELD_GUIDANCE = {
+    "tech_stack": (
+        "Search for any programming languages, frameworks, cloud providers, databases, "
+        "or tools mentioned. Include inferred technologies (e.g. if the context mentions 'React app' "
+        "or 'Python API')."
+    ),
+    "recent_news": (
+        "Look for any events, announcements, funding, product launches, layoffs, "
+        "partnerships, or leadership changes. Include up to 5 items."
+    ),
+    "common_interview_questions": (
+        "Extract questions that are explicitly stated or directly quoted "
+        "in the context from candidate reviews, Glassdoor, Blind, or Reddit. Do NOT paraphrase, "
+        "infer, or invent generic questions. If no specific questions appear in the context, return "
+        "an empty list."
+    ),
+    "financials": (
+        "Extract specific numbers from the context — annual revenue, ARR, market cap, "
+        "stock ticker and recent price, total funding raised, funding round (Series A/B/C/D), "
+        "valuation figures, IPO status, or EBITDA. Always include the year the figure refers to. "
+        "Write a 2-4 sentence paragraph summarising the financial picture. Only use "
+        "'Not publicly available' if NO financial figures appear anywhere in the context."
+    ),
+    "red_flags": (
+        "Look for any negative signals — layoffs, culture complaints, high turnover, "
+        "legal issues, controversies, or negative employee sentiment. Be objective, not alarmist."
+    ),
+}
+
 
 def _get_llm() -> ChatOpenAI:
     global _llm
@@ -21,26 +113,191 @@ def _get_llm() -> ChatOpenAI:
             model="gpt-4o-mini",
             api_key=os.getenv("OPENAI_API_KEY"),
             temperature=0,
+            callbacks=[LLMMetricsHandler("report", "gpt-4o-mini")],
+            rate_limiter=get_llm_limiter(),
+            **llm_http_clients(),
         )
     return _llm
 
 
-def _fetch_all_chunks() -> list[str]:
-    """Retrieve every document stored in ChromaDB — no k limit."""
-    collection = get_collection()
-    if collection.count() == 0:
-        return []
-    result = collection.get(include=["documents"])
-    docs = result.get("documents") or []
-    return [d for d in docs if d]
+def _fetch_all_chunks(company_name: str) -> tuple[list[str], list[str]]:
+    """Retrieve every document stored in the company's ChromaDB namespace — no k limit.
+
+    Returns (documents, categories) where categories[i] is the research
+    category that found documents[i].
+    """
+    if namespace_chunk_count(company_name) == 0:
+        return [], []
+    result = get_collection(company_name).get(include=["documents", "metadatas"])
+    pairs = [
+        (doc, (meta or {}).get("category", "default"))
+        for doc, meta in zip(result.get("documents") or [], result.get("metadatas") or [])
+        if doc
+    ]
+    return [doc for doc, _ in pairs], [category for _, category in pairs]
+
+
+def _build_prompt(company_name: str, context_block: str, fields=None) -> str:
+    """Analyst prompt for the whole report, or only `fields` when given."""
+    scope = (
+        "a comprehensive structured report"
+        if fields is None
+        else f"the following sections of a structured report: {', '.join(fields)}"
+    )
+    guidance = "".join(
+        f"- {name}: {text}\n"
+        for name, text in _FIELD_GUIDANCE.items()
+        if fields is None or name in fields
+    )
+    return (
+        f"You are a company research analyst preparing a detailed briefing for a job candidate "
+        f"who is about to interview at {company_name}.\n\n"
+        f"Generate {scope} using ONLY the context provided below. "
+        f"Do not invent facts.\n\n"
+        f"RULES FOR MISSING INFORMATION:\n"
+        f"- String fields: write 'Information not available' when absent from context.\n"
+        f"- List fields: return an EMPTY LIST [] when absent. NEVER put 'Information not available' "
+        f"as a list item — that is invalid. Either populate the list or leave it empty.\n\n"
+        + (f"FIELD-SPECIFIC GUIDANCE:\n{guidance}\n" if guidance else "")
+        + f"CONTEXT:\n{context_block}"
+    )
+
+
+def _pack(company_name: str, chunks: list[str], field_queries: dict[str, str], budget: int, label: str) -> str:
+    packed = pack_context(chunks, field_queries, budget=budget)
+    logger.info(
+        "Context for '%s' (%s): %d/%d chunks, %d tokens of %d budget, %d tokens saved, %d near-duplicates dropped",
+        company_name,
+        label,
+        len(packed.chunks),
+        len(chunks),
+        packed.tokens_used,
+        budget,
+        packed.tokens_saved,
+        packed.duplicates_dropped,
+    )
+    return "\n\n---\n\n".join(packed.chunks)
+
+
+def _section_chunks(section: str, context_chunks: list[str], chunk_categories) -> list[str]:
+    categories = REPORT_SECTION_CATEGORIES.get(section)
+    if not categories or chunk_categories is None:
+        return context_chunks
+    focused = [c for c, cat in zip(context_chunks, chunk_categories) if cat in categories]
+    return focused or context_chunks
+
+
+def _section_prompt(company_name: str, section: str, context_chunks: list[str], chunk_categories=None) -> str:
+    fields = REPORT_SECTIONS[section]
+    context_chunks = _section_chunks(section, context_chunks, chunk_categories)
+    context_block = _pack(
+        company_name,
+        context_chunks,
+        {name: REPORT_FIELD_QUERIES[name] for name in fields},
+        REPORT_SECTION_TOKEN_BUDGET,
+        section,
+    )
+    return _build_prompt(company_name, context_block, fields)
+
+
+def _log_section_failure(company_name: str, section: str, attempt: int, error: Exception) -> None:
+    logger.warning(
+        "Section '%s' for '%s' failed (attempt %d/%d): %s",
+        section,
+        company_name,
+        attempt + 1,
+        REPORT_SECTION_RETRIES + 1,
+        error,
+    )
+
+
+async def _agenerate_section(
+    company_name: str, section: str, context_chunks: list[str], chunk_categories=None
+) -> dict:
+    """Generate one section group, retrying only this section on failure."""
+    prompt = await run_blocking(_section_prompt, company_name, section, context_chunks, chunk_categories)
+    structured_llm = _get_llm().with_structured_output(_SECTION_MODELS[section])
+    for attempt in range(REPORT_SECTION_RETRIES + 1):
+        try:
+            return (await structured_llm.ainvoke(prompt)).model_dump()
+        except Exception as e:
+            if attempt == REPORT_SECTION_RETRIES:
+                raise
+            _log_section_failure(company_name, section, attempt, e)
+
+
+async def agenerate_sections(
+    company_name: str, context_chunks: list[str], sections=None, chunk_categories=None
+) -> dict:
+    """Generate section groups concurrently and return their merged field values.
+
+    Each section gets its own context, packed for just its fields, and its
+    own structured-output call, so wall-clock time is the slowest section
+    rather than one long completion for the whole report.
+
+    Args:
+        company_name: The company being researched.
+        context_chunks: Candidate context chunks.
+        sections: Names from REPORT_SECTIONS to generate (default: all).
+        chunk_categories: Research category of each chunk, if known; sections
+                          listed in REPORT_SECTION_CATEGORIES then only see
+                          chunks from their categories.
+
+    Returns:
+        Report field name -> value for every field in the requested sections.
+    """
+    sections = list(sections or REPORT_SECTIONS)
+    results = await asyncio.gather(
+        *(_agenerate_section(company_name, s, context_chunks, chunk_categories) for s in sections)
+    )
+    fields = {}
+    for result in results:
+        fields.update(result)
+    return fields
+
+
+def sections_affected_by(categories) -> list[str]:
+    """Sections, in REPORT_SECTIONS order, that depend on any of `categories`."""
+    categories = set(categories)
+    return [
+        section
+        for section in REPORT_SECTIONS
+        if categories.intersection(REPORT_SECTION_DEPENDENCIES.get(section, ()))
+    ]
 
 
-def generate_report(company_name: str, all_context: list[str]) -> CompanyReport:
+async def aupdate_report(
+    company_name: str, report: CompanyReport, categories, all_context: list[str]
+) -> CompanyReport:
+    """Regenerate only the sections of `report` affected by refreshed `categories`.
+
+    Sections are generated as in sectioned mode from the company's current
+    ChromaDB chunks; every other field keeps its stored value.
+    """
+    sections = sections_affected_by(categories)
+    if not sections:
+        return report
+    chroma_chunks, chunk_categories = await run_blocking(_fetch_all_chunks, company_name)
+    context_chunks = chroma_chunks if chroma_chunks else all_context
+    fields = await agenerate_sections(
+        company_name, context_chunks, sections=sections, chunk_categories=chunk_categories or None
+    )
+    logger.info("Updated report sections for '%s': %s", company_name, ", ".join(sections))
+    return CompanyReport.model_validate({**report.model_dump(), **fields, "company_name": company_name})
+
+
+async def agenerate_report(company_name: str, all_context: list[str]) -> CompanyReport:
     """Generate a structured CompanyReport using all available context.
 
-    Fetches every chunk from ChromaDB (no top-k restriction), falls back to
-    the raw `all_context` list if ChromaDB is empty, then calls the LLM via
-    structured output to populate every field of CompanyReport.
+    Fetches every chunk in the company's ChromaDB namespace, falls back to
+    the raw `all_context` list if ChromaDB is empty, packs the chunks that best
+    cover each report field into REPORT_CONTEXT_TOKEN_BUDGET tokens, then calls
+    the LLM via structured output to populate every field of CompanyReport.
+    With REPORT_MODE=sectioned the section groups are generated concurrently,
+    each from the chunks of its own research categories, and merged instead.
+
+    ChromaDB reads and context packing run through run_blocking; the LLM is
+    awaited with ainvoke so no thread is held while the completion streams in.
 
     Args:
         company_name: The name of the company to research.
@@ -51,45 +308,17 @@ def generate_report(company_name: str, all_context: list[str]) -> CompanyReport:
     Returns:
         A fully populated CompanyReport instance.
     """
-    # 1. Pull all embedded chunks from ChromaDB; fall back to raw texts
-    chroma_chunks = _fetch_all_chunks()
+    chroma_chunks, chunk_categories = await run_blocking(_fetch_all_chunks, company_name)
     context_chunks = chroma_chunks if chroma_chunks else all_context
 
-    # 2. Join chunks with a separator so the LLM sees distinct sources
-    context_block = "\n\n---\n\n".join(context_chunks)
+    if REPORT_MODE == "sectioned":
+        fields = await agenerate_sections(company_name, context_chunks, chunk_categories=chunk_categories or None)
+        return CompanyReport.model_validate({"company_name": company_name, **fields})
 
-    # 3. Build the analyst prompt
-    prompt = (
-        f"You are a company research analyst preparing a detailed briefing for a job candidate "
-        f"who is about to interview at {company_name}.\n\n"
-        f"Generate a comprehensive structured report using ONLY the context provided below. "
-        f"Do not invent facts.\n\n"
-        f"RULES FOR MISSING INFORMATION:\n"
-        f"- String fields: write 'Information not available' when absent from context.\n"
-        f"- List fields: return an EMPTY LIST [] when absent. NEVER put 'Information not available' "
-        f"as a list item — that is invalid. Either populate the list or leave it empty.\n\n"
-        f"FIELD-SPECIFIC GUIDANCE:\n"
-        f"- tech_stack: Search for any programming languages, frameworks, cloud providers, databases, "
-        f"or tools mentioned. Include inferred technologies (e.g. if the context mentions 'React app' "
-        f"or 'Python API').\n"
-        f"- recent_news: Look for any events, announcements, funding, product launches, layoffs, "
-        f"partnerships, or leadership changes. Include up to 5 items.\n"
-        f"- common_interview_questions: Extract questions that are explicitly stated or directly quoted "
-        f"in the context from candidate reviews, Glassdoor, Blind, or Reddit. Do NOT paraphrase, "
-        f"infer, or invent generic questions. If no specific questions appear in the context, return "
-        f"an empty list.\n"
-        f"- financials: Extract specific numbers from the context — annual revenue, ARR, market cap, "
-        f"stock ticker and recent price, total funding raised, funding round (Series A/B/C/D), "
-        f"valuation figures, IPO status, or EBITDA. Always include the year the figure refers to. "
-        f"Write a 2-4 sentence paragraph summarising the financial picture. Only use "
-        f"'Not publicly available' if NO financial figures appear anywhere in the context.\n"
-        f"- red_flags: Look for any negative signals — layoffs, culture complaints, high turnover, "
-        f"legal issues, controversies, or negative employee sentiment. Be objective, not alarmist.\n\n"
-        f"CONTEXT:\n{context_block}"
+    context_block = await run_blocking(
+        _pack, company_name, context_chunks, REPORT_FIELD_QUERIES, REPORT_CONTEXT_TOKEN_BUDGET, "full"
     )
-
-    # 4. Invoke LLM with structured output bound to CompanyReport schema
-    llm = _get_llm()
-    structured_llm = llm.with_structured_output(CompanyReport)
-    report: CompanyReport = structured_llm.invoke(prompt)
+    prompt = _build_prompt(company_name, context_block)
+    structured_llm = _get_llm().with_structured_output(CompanyReport)
+    report: CompanyReport = await structured_llm.ainvoke(prompt)
     return report
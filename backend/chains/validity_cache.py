@@ -0,0 +1,115 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+try:
+    from core.keys import normalize_company_name
+    from core.metrics import record_cache_lookup
+except ModuleNotFoundError:
+    from backend.core.keys import normalize_company_name
+    from backend.core.metrics import record_cache_lookup
+
+COMPANY_VALIDITY_CACHE_PATH = os.getenv("COMPANY_VALIDITY_CACHE_PATH", "./cache/company_validity.db")
+# A company confirmed as real is trusted for this long.
+COMPANY_VALIDITY_TTL_S = float(os.getenv("COMPANY_VALIDITY_TTL_S", str(30 * 24 * 60 * 60)))
+# "Not a real company" answers expire sooner: a new startup may be unknown today.
+COMPANY_VALIDITY_NEGATIVE_TTL_S = float(os.getenv("COMPANY_VALIDITY_NEGATIVE_TTL_S", str(24 * 60 * 60)))
+COMPANY_VALIDITY_MEMORY_ENTRIES = int(os.getenv("COMPANY_VALIDITY_MEMORY_ENTRIES", "1024"))
+
+
+def _is_expired(is_real: bool, checked_at: float) -> bool:
+    ttl = COMPANY_VALIDITY_TTL_S if is_real else COMPANY_VALIDITY_NEGATIVE_TTL_S
+    return time.time() - checked_at > ttl
+
+
+class CompanyValidityCache:
+    """Memoized answers to "is this a real company?".
+
+    An in-process LRU sits in front of a SQLite table so repeat chat messages
+    skip both the LLM and the disk, while answers survive restarts. Keys are
+    normalized company names.
+    """
+
+    def __init__(self, path: str, memory_entries: int = COMPANY_VALIDITY_MEMORY_ENTRIES):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, tuple[bool, float]] = OrderedDict()
+        self._memory_entries = memory_entries
+        self._hits = 0
+        self._misses = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS company_validity ("
+            " company_key TEXT PRIMARY KEY,"
+            " is_real INTEGER NOT NULL,"
+            " checked_at REAL NOT NULL)"
+        )
+
+    def _remember(self, key: str, is_real: bool, checked_at: float) -> None:
+        self._memory[key] = (is_real, checked_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, company_name: str) -> Optional[bool]:
+        """Cached answer for a company, or None if unknown or expired."""
+        key = normalize_company_name(company_name)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                entry = self._conn.execute(
+                    "SELECT is_real, checked_at FROM company_validity WHERE company_key = ?",
+                    (key,),
+                ).fetchone()
+                if entry is not None:
+                    entry = (bool(entry[0]), entry[1])
+                    self._remember(key, *entry)
+            else:
+                self._memory.move_to_end(key)
+            if entry is None or _is_expired(*entry):
+                self._misses += 1
+                record_cache_lookup("company_validity", hit=False)
+                return None
+            self._hits += 1
+        record_cache_lookup("company_validity", hit=True)
+        return entry[0]
+
+    def set(self, company_name: str, is_real: bool) -> None:
+        key = normalize_company_name(company_name)
+        now = time.time()
+        with self._lock:
+            self._remember(key, is_real, now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO company_validity (company_key, is_real, checked_at) VALUES (?, ?, ?)",
+                (key, int(is_real), now),
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM company_validity").fetchone()[0]
+            lookups = self._hits + self._misses
+            return {
+                "entries": entries,
+                "memory_entries": len(self._memory),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_validity_cache() -> CompanyValidityCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = CompanyValidityCache(COMPANY_VALIDITY_CACHE_PATH)
+    return _cache
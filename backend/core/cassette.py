@@ -0,0 +1,317 @@
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# off: talk to the real services. record: talk to them and append every
+# exchange to the cassette. replay: answer from the cassette, never the network.
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off").lower()
+CASSETTE_PATH = os.getenv("CASSETTE_PATH", "./cache/cassette.jsonl.gz")
+# recorded: replayed responses take as long as they did when recorded. none: full speed.
+CASSETTE_REPLAY_LATENCY = os.getenv("CASSETTE_REPLAY_LATENCY", "recorded").lower()
+
+# httpx's own defaults, applied to the wrapped transport since a client
+# given an explicit transport ignores its `limits` argument.
+_DEFAULT_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+# Request body fields that carry credentials rather than identify the request.
+_UNKEYED_FIELDS = {"api_key"}
+
+
+class CassetteMiss(Exception):
+    """Replay mode got a request that was never recorded."""
+
+
+def request_key(method: str, url: str, body: bytes) -> str:
+    """Identity of a request: method, path, query and canonical JSON body.
+
+    The host is left out so a cassette recorded against the real APIs also
+    replays behind a different base URL, and credentials are never part of it.
+    """
+    parts = urlsplit(url)
+    try:
+        payload = json.loads(body) if body else None
+    except ValueError:
+        canonical = body
+    else:
+        if isinstance(payload, dict):
+            payload = {k: v for k, v in payload.items() if k not in _UNKEYED_FIELDS}
+        canonical = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.sha256(f"{method.upper()} {parts.path}?{parts.query}\n".encode("utf-8") + canonical)
+    return digest.hexdigest()[:32]
+
+
+@dataclass
+class Interaction:
+    status: int
+    content_type: str
+    body: bytes
+    elapsed_s: float
+
+    def to_line(self, key: str, method: str, url: str) -> str:
+        try:
+            body, encoding = self.body.decode("utf-8"), "utf-8"
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(self.body).decode("ascii"), "base64"
+        return json.dumps({
+            "key": key,
+            "method": method,
+            "url": url,
+            "status": self.status,
+            "content_type": self.content_type,
+            "elapsed_s": round(self.elapsed_s, 4),
+            "encoding": encoding,
+            "body": body,
+        })
+
+    @classmethod
+    def from_entry(cls, entry: dict) -> "Interaction":
+        body = entry["body"]
+        raw = base64.b64decode(body) if entry.get("encoding") == "base64" else body.encode("utf-8")
+        return cls(entry["status"], entry["content_type"], raw, entry["elapsed_s"])
+
+    @property
+    def replay_delay(self) -> float:
+        return self.elapsed_s if CASSETTE_REPLAY_LATENCY == "recorded" else 0.0
+
+
+class Cassette:
+    """Recorded HTTP exchanges in a gzipped JSON-lines file.
+
+    Requests that repeat (the same search twice in one run) are replayed in
+    recording order, and the last recording is reused once they run out.
+    Recording appends, so several runs can be captured into one cassette.
+    """
+
+    def __init__(self, path: str, mode: str):
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._entries: dict[str, list[Interaction]] = {}
+        self._cursor: dict[str, int] = {}
+        self._file = None
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        if mode == "replay":
+            self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Cassette not found: {self.path}")
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], []).append(Interaction.from_entry(entry))
+            except EOFError:
+                # A recording process that was killed leaves the last gzip member unterminated.
+                logger.warning("Cassette %s ends abruptly; using the complete entries", self.path)
+        logger.info("Cassette %s loaded: %d distinct requests", self.path, len(self._entries))
+
+    def lookup(self, key: str, method: str, url: str) -> Interaction:
+        with self._lock:
+            recordings = self._entries.get(key)
+            if not recordings:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded response for {method} {url}")
+            position = self._cursor.get(key, 0)
+            self._cursor[key] = position + 1
+            self.replayed += 1
+            return recordings[min(position, len(recordings) - 1)]
+
+    def record(self, key: str, method: str, url: str, interaction: Interaction) -> None:
+        line = interaction.to_line(key, method, url)
+        with self._lock:
+            if self._file is None:
+                if os.path.dirname(self.path):
+                    os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self._file = gzip.open(self.path, "at", encoding="utf-8")
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.recorded += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "path": self.path,
+                "recorded": self.recorded,
+                "replayed": self.replayed,
+                "misses": self.misses,
+            }
+
+
+def _to_httpx(interaction: Interaction, request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        interaction.status,
+        headers={"content-type": interaction.content_type},
+        content=interaction.body,
+        request=request,
+    )
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """httpx transport that records through, or replays from, a cassette.
+
+    Recorded responses are read in full before being returned, so streamed
+    responses arrive in one piece while recording.
+    """
+
+    def __init__(self, cassette: Cassette, transport: httpx.BaseTransport):
+        self._cassette = cassette
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        key = request_key(request.method, url, request.read())
+        if self._cassette.mode == "replay":
+            interaction = self._cassette.lookup(key, request.method, url)
+            if interaction.replay_delay:
+                time.sleep(interaction.replay_delay)
+            return _to_httpx(interaction, request)
+        t0 = time.perf_counter()
+        response = self._transport.handle_request(request)
+        try:
+            body = response.read()
+        finally:
+            response.close()
+        interaction = Interaction(response.status_code, response.headers.get("content-type", ""), body, time.perf_counter() - t0)
+        self._cassette.record(key, request.method, url, interaction)
+        return _to_httpx(interaction, request)
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of CassetteTransport."""
+
+    def __init__(self, cassette: Cassette, transport: httpx.AsyncBaseTransport):
+        self._cassette = cassette
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        key = request_key(request.method, url, await request.aread())
+        if self._cassette.mode == "replay":
+            interaction = self._cassette.lookup(key, request.method, url)
+            if interaction.replay_delay:
+                await asyncio.sleep(interaction.replay_delay)
+            return _to_httpx(interaction, request)
+        t0 = time.perf_counter()
+        response = await self._transport.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        interaction = Interaction(response.status_code, response.headers.get("content-type", ""), body, time.perf_counter() - t0)
+        self._cassette.record(key, request.method, url, interaction)
+        return _to_httpx(interaction, request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class CassetteAdapter(HTTPAdapter):
+    """requests adapter equivalent of CassetteTransport, for the sync Tavily client."""
+
+    def __init__(self, cassette: Cassette):
+        super().__init__()
+        self._cassette = cassette
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        key = request_key(request.method, request.url, body)
+        if self._cassette.mode == "replay":
+            interaction = self._cassette.lookup(key, request.method, request.url)
+            if interaction.replay_delay:
+                time.sleep(interaction.replay_delay)
+            response = requests.Response()
+            response.status_code = interaction.status
+            response.headers["content-type"] = interaction.content_type
+            response._content = interaction.body
+            response.url = request.url
+            response.request = request
+            return response
+        t0 = time.perf_counter()
+        response = super().send(request, **kwargs)
+        interaction = Interaction(
+            response.status_code, response.headers.get("content-type", ""), response.content, time.perf_counter() - t0
+        )
+        self._cassette.record(key, request.method, request.url, interaction)
+        return response
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Optional[Cassette]:
+    """The process-wide cassette, or None when CASSETTE_MODE is off."""
+    global _cassette
+    if CASSETTE_MODE not in ("record", "replay"):
+        return None
+    if _cassette is None:
+        with _cassette_lock:
+            if _cassette is None:
+                _cassette = Cassette(CASSETTE_PATH, CASSETTE_MODE)
+    return _cassette
+
+
+def create_http_client(**kwargs) -> httpx.Client:
+    """httpx client that goes through the cassette when one is active."""
+    cassette = get_cassette()
+    if cassette is None:
+        return httpx.Client(**kwargs)
+    transport = httpx.HTTPTransport(limits=kwargs.pop("limits", _DEFAULT_LIMITS))
+    return httpx.Client(transport=CassetteTransport(cassette, transport), **kwargs)
+
+
+def create_async_http_client(**kwargs) -> httpx.AsyncClient:
+    """Async httpx client that goes through the cassette when one is active."""
+    cassette = get_cassette()
+    if cassette is None:
+        return httpx.AsyncClient(**kwargs)
+    transport = httpx.AsyncHTTPTransport(limits=kwargs.pop("limits", _DEFAULT_LIMITS))
+    return httpx.AsyncClient(transport=AsyncCassetteTransport(cassette, transport), **kwargs)
+
+
+def create_requests_session() -> Optional[requests.Session]:
+    """requests session for the sync Tavily client: None unless a cassette is active."""
+    cassette = get_cassette()
+    if cassette is None:
+        return None
+    session = requests.Session()
+    adapter = CassetteAdapter(cassette)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def llm_http_clients() -> dict:
+    """http_client / http_async_client arguments for ChatOpenAI; empty when no cassette is active."""
+    if get_cassette() is None:
+        return {}
+    return {"http_client": create_http_client(), "http_async_client": create_async_http_client()}
@@ -0,0 +1,40 @@
+import functools
+import os
+from typing import Callable, TypeVar
+
+import anyio
+import anyio.to_thread
+
+T = TypeVar("T")
+
+# Worker threads available to blocking calls (ChromaDB, local SQLite scans,
+# CPU-bound packing) made from async code. Bounded separately from Starlette's
+# own threadpool so a burst of research runs cannot starve request handling.
+BLOCKING_CONCURRENCY = int(os.getenv("BLOCKING_CONCURRENCY", "16"))
+
+_limiter = None
+
+
+def _get_limiter() -> anyio.CapacityLimiter:
+    global _limiter
+    if _limiter is None:
+        _limiter = anyio.CapacityLimiter(BLOCKING_CONCURRENCY)
+    return _limiter
+
+
+async def run_blocking(func: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking call in a worker thread without holding up the event loop.
+
+    At most BLOCKING_CONCURRENCY such calls run at once; the rest wait for a
+    free slot instead of spawning more threads.
+    """
+    return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=_get_limiter())
+
+
+def blocking_stats() -> dict:
+    limiter = _get_limiter()
+    return {
+        "capacity": int(limiter.total_tokens),
+        "in_use": int(limiter.borrowed_tokens),
+        "waiting": limiter.statistics().tasks_waiting,
+    }
@@ -0,0 +1,18 @@
+import re
+
+_LEGAL_SUFFIXES = {
+    "inc", "incorporated", "llc", "ltd", "limited", "corp", "corporation",
+    "co", "company", "plc", "gmbh", "ag", "sa", "bv",
+}
+
+
+def normalize_company_name(company_name: str) -> str:
+    """Canonical cache key for a company name.
+
+    Case, punctuation, repeated whitespace and trailing legal suffixes are
+    ignored, so "Stripe", " stripe " and "Stripe, Inc." share one key.
+    """
+    words = re.sub(r"[^\w&]+", " ", company_name.casefold()).split()
+    while len(words) > 1 and words[-1] in _LEGAL_SUFFIXES:
+        words.pop()
+    return "_".join(words)
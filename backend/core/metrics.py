@@ -0,0 +1,85 @@
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Request latencies span milliseconds (cache hits) to a minute (cold research runs).
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests currently being served")
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency, including streamed bodies",
+    ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+NODE_SECONDS = Histogram(
+    "research_node_duration_seconds", "Research graph node latency", ["node"], buckets=_LATENCY_BUCKETS
+)
+SEARCH_SECONDS = Histogram(
+    "search_query_duration_seconds",
+    "Tavily query latency (cache hits excluded)",
+    ["category", "outcome"],
+    buckets=_LATENCY_BUCKETS,
+)
+EMBEDDING_BATCH_SECONDS = Histogram(
+    "embedding_batch_duration_seconds", "Latency per embedding batch", ["embedder"], buckets=_LATENCY_BUCKETS
+)
+EMBEDDING_TEXTS = Counter("embedding_texts_total", "Texts sent to the embedder", ["embedder"])
+VECTOR_QUERY_SECONDS = Histogram(
+    "vector_query_duration_seconds",
+    "Retrieval stage latency per query",
+    ["stage"],
+    buckets=_LATENCY_BUCKETS,
+)
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_duration_seconds", "LLM call latency", ["operation", "model", "outcome"], buckets=_LATENCY_BUCKETS
+)
+LLM_TOKENS = Counter("llm_tokens_total", "LLM tokens consumed", ["operation", "model", "kind"])
+CACHE_LOOKUPS = Counter("cache_lookups_total", "Cache lookups by cache and result (hit or miss)", ["cache", "result"])
+REPORT_RUNS_COALESCED = Counter(
+    "report_runs_coalesced_total", "Report requests that joined a pipeline run already in flight"
+)
+JOB_QUEUE_DEPTH = Gauge("job_queue_depth", "Research jobs waiting for a worker")
+
+
+def record_cache_lookup(cache: str, hit: bool, count: int = 1) -> None:
+    if count:
+        CACHE_LOOKUPS.labels(cache=cache, result="hit" if hit else "miss").inc(count)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Current metrics in the Prometheus text exposition format, with its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """ASGI middleware tracking in-flight requests and latency per route template.
+
+    Implemented at the ASGI level rather than with @app.middleware so that
+    streamed responses count as in flight until their last byte is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"], getattr(route, "path", "unmatched"), str(status["code"])
+            ).observe(time.perf_counter() - start)
@@ -0,0 +1,104 @@
+import asyncio
+import os
+import threading
+import time
+
+from langchain_core.rate_limiters import BaseRateLimiter
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every caller in the process.
+
+    Tokens refill continuously at `rate` per second up to `capacity`. A caller
+    that finds the bucket empty reserves the next token (the balance may go
+    negative) and sleeps until it is due, so waiters are served in arrival
+    order without holding the lock while they sleep.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = max(float(capacity), 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is available right now."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def acquire(self) -> float:
+        """Block until a token is available. Returns the time spent waiting."""
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self) -> float:
+        """Like acquire(), but waits without blocking the event loop."""
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class TokenBucketRateLimiter(BaseRateLimiter):
+    """Adapts a TokenBucket to LangChain's rate_limiter hook on chat models."""
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        if not blocking:
+            return self.bucket.try_acquire()
+        self.bucket.acquire()
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        if not blocking:
+            return self.bucket.try_acquire()
+        await self.bucket.acquire_async()
+        return True
+
+
+_llm_limiter = None
+_llm_limiter_lock = threading.Lock()
+
+
+def get_llm_limiter() -> TokenBucketRateLimiter:
+    """Return the process-wide limiter shared by every chat model call.
+
+    Report generation, chat answers and company checks draw from one budget,
+    so a large batch cannot push the process past the provider's request
+    limit. Configured with LLM_RATE_LIMIT_PER_S and LLM_RATE_LIMIT_BURST.
+    """
+    global _llm_limiter
+    if _llm_limiter is None:
+        with _llm_limiter_lock:
+            if _llm_limiter is None:
+                _llm_limiter = TokenBucketRateLimiter(
+                    TokenBucket(
+                        rate=float(os.getenv("LLM_RATE_LIMIT_PER_S", "8")),
+                        capacity=float(os.getenv("LLM_RATE_LIMIT_BURST", "16")),
+                    )
+                )
+    return _llm_limiter
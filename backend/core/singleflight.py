@@ -0,0 +1,69 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """Coalesce concurrent calls for the same key onto one in-flight task.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same task and receive its result or exception.
+    Each waiter is shielded, so one client going away does not cancel the
+    work the others are waiting on; the task is cancelled only once every
+    waiter has gone. Keys are forgotten as soon as the task finishes, so
+    results are never reused across flights.
+    """
+
+    def __init__(self):
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """Run `func` once per key at a time.
+
+        Returns:
+            (result, shared) where shared is True if this call joined a flight
+            another caller had already started.
+        """
+        task = self._tasks.get(key)
+        shared = task is not None
+        if shared:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(func())
+            self._tasks[key] = task
+            self.started += 1
+            task.add_done_callback(lambda t: self._finish(key, t))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task), shared
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # Forget the key first so callers arriving while the
+                    # cancelled task winds down start a fresh flight.
+                    if self._tasks.get(key) is task:
+                        del self._tasks[key]
+                    task.cancel()
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._tasks
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Mark the exception as retrieved in case every waiter was cancelled.
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._tasks),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+
+from .concurrency import run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Initializes heavy subsystems in the background once the server is up.
+
+    The app starts answering requests as soon as FastAPI itself is loaded;
+    imports of ChromaDB, LangChain and LangGraph and the clients built on
+    them happen here, one step at a time in a worker thread, with each
+    step's duration recorded. A request that arrives first simply performs
+    the initialization it needs itself. A failed step is logged and keeps
+    the service from reporting ready.
+    """
+
+    def __init__(self, steps: list[tuple[str, Callable[[], object]]]):
+        self._steps = steps
+        self.timings: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+        self.finished = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+    async def _run(self) -> None:
+        t0 = time.perf_counter()
+        for name, step in self._steps:
+            started = time.perf_counter()
+            try:
+                await run_blocking(step)
+            except Exception as e:
+                self.errors[name] = repr(e)
+                logger.error("warmup step=%s event=failed error=%r", name, e)
+            self.timings[name] = round(time.perf_counter() - started, 3)
+        self.finished = True
+        logger.info(
+            "warmup event=finished total_s=%.2f %s",
+            time.perf_counter() - t0,
+            " ".join(f"{name}_s={elapsed:.2f}" for name, elapsed in self.timings.items()),
+        )
+
+    @property
+    def ready(self) -> bool:
+        return self.finished and not self.errors
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "steps_s": dict(self.timings),
+            "pending": [name for name, _ in self._steps if name not in self.timings],
+            "errors": dict(self.errors),
+        }
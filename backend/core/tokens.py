@@ -0,0 +1,26 @@
+import logging
+import os
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_TOKENIZER_MODEL = os.getenv("CONTEXT_TOKENIZER_MODEL", "gpt-4o-mini")
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    """tiktoken encoding for the report model, or None if it cannot be loaded (e.g. offline)."""
+    try:
+        import tiktoken
+
+        return tiktoken.encoding_for_model(CONTEXT_TOKENIZER_MODEL)
+    except Exception as e:
+        logger.warning("tiktoken unavailable (%s) — estimating tokens as characters / 4", e)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
@@ -0,0 +1,139 @@
+import asyncio
+import itertools
+import logging
+import os
+from typing import Awaitable, Callable, Optional
+
+try:
+    from core.concurrency import run_blocking
+except ModuleNotFoundError:
+    from backend.core.concurrency import run_blocking
+
+from .store import JOB_LEASE_S, PRIORITIES, Job, JobStore, get_job_store
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Submissions beyond this many waiting jobs are refused rather than queued.
+JOB_MAX_QUEUE_DEPTH = int(os.getenv("JOB_MAX_QUEUE_DEPTH", "1000"))
+
+
+class QueueFull(Exception):
+    pass
+
+
+class JobQueue:
+    """Priority queue of research jobs drained by a fixed pool of async workers.
+
+    Throughput is bounded by JOB_WORKERS regardless of how many clients are
+    waiting; higher-priority jobs are taken first and equal priorities run in
+    submission order. Job state lives in the JobStore, so the queue itself
+    holds only ids and can be rebuilt from the store after a restart. Jobs
+    whose lease expires while the server is up (their worker died in another
+    process) are picked up again by a periodic sweep.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[Job], Awaitable[dict]],
+        store: Optional[JobStore] = None,
+        workers: int = JOB_WORKERS,
+        max_depth: int = JOB_MAX_QUEUE_DEPTH,
+    ):
+        self._runner = runner
+        self._job_store = store
+        self._worker_count = workers
+        self._max_depth = max_depth
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._workers: list[asyncio.Task] = []
+        self._depth = {level: 0 for level in PRIORITIES.values()}
+        self.busy = 0
+
+    @property
+    def _store(self) -> JobStore:
+        if self._job_store is None:
+            self._job_store = get_job_store()
+        return self._job_store
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._store.get(job_id)
+
+    async def start(self) -> None:
+        """Start the workers and re-enqueue jobs a previous process left unfinished."""
+        self._queue = asyncio.PriorityQueue()
+        for job in await run_blocking(self._store.unfinished):
+            self._put(job)
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self._worker_count)]
+        self._workers.append(asyncio.create_task(self._requeue_expired()))
+        logger.info("Job queue started: %d workers, %d jobs resumed", self._worker_count, self._queue.qsize())
+
+    async def stop(self) -> None:
+        """Cancel the workers; running jobs go back to queued and resume on next start."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, company_name: str, priority: str = "normal", force_refresh: bool = False) -> Job:
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        if self._queue.qsize() >= self._max_depth:
+            raise QueueFull(f"Job queue is full ({self._max_depth} waiting)")
+        job = await run_blocking(self._store.create, company_name, PRIORITIES[priority], force_refresh)
+        self._put(job)
+        return job
+
+    def _put(self, job: Job) -> None:
+        self._depth[job.priority] += 1
+        self._queue.put_nowait((job.priority, next(self._sequence), job.id))
+
+    async def _requeue_expired(self) -> None:
+        while True:
+            await asyncio.sleep(JOB_LEASE_S / 2)
+            for job in await run_blocking(self._store.requeue_expired):
+                logger.warning("Job %s for '%s' outlived its lease; requeued", job.id, job.company_name)
+                self._put(job)
+
+    async def _work(self) -> None:
+        while True:
+            priority, _, job_id = await self._queue.get()
+            self._depth[priority] -= 1
+            self.busy += 1
+            try:
+                await self._run(job_id)
+            finally:
+                self.busy -= 1
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = await run_blocking(self._store.get, job_id)
+        if job is None or not await run_blocking(self._store.claim, job_id):
+            return
+        try:
+            result = await self._runner(job)
+        except asyncio.CancelledError:
+            # Shielded so the hand-back completes even though this task is being cancelled.
+            await asyncio.shield(run_blocking(self._store.release, job_id))
+            raise
+        except Exception as e:
+            # HTTPException-style errors carry a status code and a detail message.
+            error = str(getattr(e, "detail", e))
+            logger.warning("Job %s for '%s' failed: %s", job_id, job.company_name, error)
+            await run_blocking(self._store.mark_failed, job_id, error, getattr(e, "status_code", None))
+            return
+        await run_blocking(self._store.mark_succeeded, job_id, result)
+
+    def depth(self) -> int:
+        """Jobs waiting for a worker."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> dict:
+        names = {level: name for name, level in PRIORITIES.items()}
+        return {
+            "workers": self._worker_count,
+            "busy_workers": self.busy,
+            "queue_depth": self.depth(),
+            "queue_depth_by_priority": {names[level]: depth for level, depth in self._depth.items()},
+            "jobs": self._store.stats(),
+        }
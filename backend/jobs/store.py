@@ -0,0 +1,213 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "./cache/jobs.db")
+# Finished jobs kept for GET /jobs/{id}; the oldest are pruned past this.
+JOB_MAX_FINISHED = int(os.getenv("JOB_MAX_FINISHED", "10000"))
+# A running job not finished within this many seconds is presumed abandoned
+# by a crashed worker and handed out again; keep it above the longest run.
+JOB_LEASE_S = float(os.getenv("JOB_LEASE_S", "1800"))
+# Runs a job may start before it is failed instead of being handed out again.
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+_COLUMNS = (
+    "id, company_name, force_refresh, priority, status, result, error, status_code,"
+    " created_at, started_at, finished_at, attempts"
+)
+
+
+@dataclass
+class Job:
+    id: str
+    company_name: str
+    force_refresh: bool
+    priority: int
+    status: str
+    result: Optional[dict]
+    error: Optional[str]
+    status_code: Optional[int]
+    created_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
+    attempts: int
+
+    @classmethod
+    def from_row(cls, row: tuple) -> "Job":
+        values = list(row)
+        values[2] = bool(values[2])
+        values[5] = json.loads(values[5]) if values[5] else None
+        return cls(*values)
+
+    @property
+    def priority_name(self) -> str:
+        return next(name for name, level in PRIORITIES.items() if level == self.priority)
+
+
+class JobStore:
+    """Persistent record of research jobs and their results.
+
+    Jobs left queued, or running past their lease when a worker died, are
+    handed back by `unfinished()` on startup, so accepted work is never
+    silently dropped. Several processes may share one store: a job runs only
+    in the worker that `claim()`s it, and a job that keeps killing its worker
+    is failed after `max_attempts` runs rather than retried forever.
+    """
+
+    def __init__(self, path: str, lease_s: float = JOB_LEASE_S, max_attempts: int = JOB_MAX_ATTEMPTS):
+        self._lease_s = lease_s
+        self._max_attempts = max_attempts
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " company_name TEXT NOT NULL,"
+            " force_refresh INTEGER NOT NULL DEFAULT 0,"
+            " priority INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " result TEXT,"
+            " error TEXT,"
+            " status_code INTEGER,"
+            " created_at REAL NOT NULL,"
+            " started_at REAL,"
+            " finished_at REAL,"
+            " attempts INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, finished_at)")
+
+    def create(self, company_name: str, priority: int, force_refresh: bool = False) -> Job:
+        job = Job(
+            id=uuid.uuid4().hex,
+            company_name=company_name,
+            force_refresh=force_refresh,
+            priority=priority,
+            status=QUEUED,
+            result=None,
+            error=None,
+            status_code=None,
+            created_at=time.time(),
+            started_at=None,
+            finished_at=None,
+            attempts=0,
+        )
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, company_name, force_refresh, priority, status, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (job.id, company_name, int(force_refresh), priority, QUEUED, job.created_at),
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.from_row(row) if row else None
+
+    def claim(self, job_id: str) -> bool:
+        """Mark a queued job running; False if another worker already took it."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 WHERE id = ? AND status = ?",
+                (RUNNING, time.time(), job_id, QUEUED),
+            )
+        return cursor.rowcount == 1
+
+    def release(self, job_id: str) -> None:
+        """Hand a running job back to the queue without counting the interrupted attempt."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL, attempts = attempts - 1 WHERE id = ? AND status = ?",
+                (QUEUED, job_id, RUNNING),
+            )
+
+    def mark_succeeded(self, job_id: str, result: dict) -> None:
+        self._finish(job_id, SUCCEEDED, json.dumps(result, default=str), None, None)
+
+    def mark_failed(self, job_id: str, error: str, status_code: Optional[int] = None) -> None:
+        self._finish(job_id, FAILED, None, error, status_code)
+
+    def _finish(self, job_id: str, status: str, result, error, status_code) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, status_code = ?, finished_at = ?"
+                " WHERE id = ?",
+                (status, result, error, status_code, time.time(), job_id),
+            )
+            self._conn.execute(
+                "DELETE FROM jobs WHERE id IN ("
+                " SELECT id FROM jobs WHERE status IN (?, ?)"
+                " ORDER BY finished_at DESC LIMIT -1 OFFSET ?)",
+                (SUCCEEDED, FAILED, JOB_MAX_FINISHED),
+            )
+
+    def unfinished(self) -> list[Job]:
+        """Queued jobs, including ones whose lease just expired, oldest first."""
+        with self._lock:
+            self._reclaim_expired()
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE status = ? ORDER BY created_at ASC", (QUEUED,)
+            ).fetchall()
+        return [Job.from_row(row) for row in rows]
+
+    def requeue_expired(self) -> list[Job]:
+        """Reset running jobs whose lease has expired to queued and return them."""
+        with self._lock:
+            ids = self._reclaim_expired()
+            if not ids:
+                return []
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE id IN ({', '.join('?' * len(ids))}) ORDER BY created_at ASC",
+                ids,
+            ).fetchall()
+        return [Job.from_row(row) for row in rows]
+
+    def _reclaim_expired(self) -> list[str]:
+        """Requeue expired running jobs, failing those out of attempts; returns the requeued ids."""
+        cutoff = time.time() - self._lease_s
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ?"
+            " WHERE status = ? AND started_at < ? AND attempts >= ?",
+            (FAILED, f"Abandoned after {self._max_attempts} attempts", time.time(), RUNNING, cutoff, self._max_attempts),
+        )
+        rows = self._conn.execute(
+            "SELECT id FROM jobs WHERE status = ? AND started_at < ?", (RUNNING, cutoff)
+        ).fetchall()
+        ids = [row[0] for row in rows]
+        self._conn.executemany("UPDATE jobs SET status = ?, started_at = NULL WHERE id = ?", [(QUEUED, i) for i in ids])
+        return ids
+
+    def stats(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)}
+        counts.update(dict(rows))
+        return counts
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = JobStore(JOB_STORE_PATH)
+    return _store
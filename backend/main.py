@@ -1,18 +1,109 @@
-import logging
 import time
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+_BOOT_STARTED = time.perf_counter()
 
-from rag.embeddings import clear_collection, embed_search_results, get_collection
-from rag.retriever import retrieve_context
-from chains.report_chain import answer_query, is_real_company
-from agents.research_graph import build_graph
+import asyncio
+import json
+import logging
+import os
+import sys
+from contextlib import asynccontextmanager
+from typing import Literal, Optional
 
+from dotenv import load_dotenv
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, field_validator
+
+# Loaded before any settings are read: the modules that used to load it at
+# import time (ChromaDB, LangChain) are now imported lazily.
+load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), ".env"), override=True)
+
+# Only light modules are imported here so the server answers /health as soon
+# as FastAPI is loaded. ChromaDB, LangChain and LangGraph are imported where
+# first used, and ahead of time by the startup warmup.
+from rag.embedding_cache import get_embedding_cache
+from chains.report_cache import get_report_store
+from chains.validity_cache import get_validity_cache
+from search.cache import get_search_cache
+from core.concurrency import blocking_stats, run_blocking
+from core.keys import normalize_company_name
+from core.metrics import (
+    JOB_QUEUE_DEPTH,
+    REPORT_RUNS_COALESCED,
+    MetricsMiddleware,
+    record_cache_lookup,
+    render_metrics,
+)
+from core.singleflight import SingleFlight
+from core.startup import Warmup
+from jobs.queue import JobQueue, QueueFull
+from jobs.store import Job
+
+logging.basicConfig(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    format="%(asctime)s level=%(levelname)s logger=%(name)s %(message)s",
+)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Company Research Assistant")
+BATCH_MAX_COMPANIES = int(os.getenv("BATCH_MAX_COMPANIES", "100"))
+# Companies from one batch researched at the same time.
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+
+def _warm_research_graph() -> None:
+    from agents.research_graph import get_research_graph
+
+    get_research_graph()
+
+
+def _warm_vector_store() -> None:
+    from rag.embeddings import open_vector_store
+
+    open_vector_store()
+
+
+def _warm_chat_chain() -> None:
+    import chains.report_chain  # noqa: F401
+
+
+def _warm_tokenizer() -> None:
+    from core.tokens import count_tokens
+
+    count_tokens("warmup")
+
+
+warmup = Warmup([
+    ("research_graph", _warm_research_graph),
+    ("vector_store", _warm_vector_store),
+    ("chat_chain", _warm_chat_chain),
+    ("tokenizer", _warm_tokenizer),
+])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    lifespan_started = time.perf_counter()
+    await job_queue.start()
+    warmup.start()
+    logger.info(
+        "startup event=serving import_s=%.2f lifespan_s=%.2f",
+        lifespan_started - _BOOT_STARTED,
+        time.perf_counter() - lifespan_started,
+    )
+    yield
+    await warmup.stop()
+    await job_queue.stop()
+    if "search.duckduckgo_client" in sys.modules:
+        await sys.modules["search.duckduckgo_client"].aclose_search_clients()
+    if "core.cassette" in sys.modules:
+        cassette = sys.modules["core.cassette"].get_cassette()
+        if cassette is not None:
+            cassette.close()
+
+
+app = FastAPI(title="Company Research Assistant", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +113,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 
 class ResearchRequest(BaseModel):
@@ -31,11 +123,44 @@ class ResearchRequest(BaseModel):
 
 class GenerateReportRequest(BaseModel):
     company_name: str
+    force_refresh: bool = False
+
+
+class ResearchJobRequest(BaseModel):
+    company_name: str
+    force_refresh: bool = False
+    priority: Literal["high", "normal", "low"] = "normal"
+
+
+class BatchReportRequest(BaseModel):
+    companies: list[str] = Field(..., min_length=1, max_length=BATCH_MAX_COMPANIES)
+    force_refresh: bool = False
+    # Lower the per-batch concurrency; values above BATCH_CONCURRENCY are capped.
+    concurrency: Optional[int] = Field(default=None, ge=1)
+
+
+class RefreshRequest(BaseModel):
+    company_name: str
+    # Refresh these categories whatever their age; by default only stale ones are searched.
+    # Names are checked against the research graph's categories by _refresh_plan.
+    categories: Optional[list[str]] = None
 
 
 class ChatRequest(BaseModel):
     company_name: str
     question: str
+    # Restrict retrieval to one research category (news, culture, tech, financials, interviews).
+    category: Optional[str] = None
+
+    @field_validator("category")
+    @classmethod
+    def _known_category(cls, category: Optional[str]) -> Optional[str]:
+        from agents.research_graph import SEARCH_NODE_CATEGORIES
+
+        known = list(SEARCH_NODE_CATEGORIES.values())
+        if category is not None and category not in known:
+            raise ValueError(f"Unknown research category: {category}. Expected one of: {', '.join(known)}.")
+        return category
 
 
 @app.get("/")
@@ -48,32 +173,75 @@ def health_check():
     return {"status": "ok"}
 
 
-research_graph = build_graph()
+@app.get("/ready")
+def readiness_check():
+    """200 once the startup warmup has loaded every subsystem, 503 until then."""
+    status = warmup.status()
+    return status if status["ready"] else JSONResponse(status_code=503, content=status)
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus scrape endpoint."""
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
+
+@app.get("/stats")
+def stats():
+    from rag.embeddings import get_registry
+    from chains.answer_cache import get_answer_cache
+    from core.cassette import get_cassette
+
+    search_cache = get_search_cache()
+    answer_cache = get_answer_cache()
+    cassette = get_cassette()
+    return {
+        "search_cache": search_cache.stats() if search_cache else None,
+        "report_cache": get_report_store().stats(),
+        "vector_namespaces": get_registry().stats(),
+        "embedding_cache": get_embedding_cache().stats(),
+        "company_validity": get_validity_cache().stats(),
+        "chat_answers": answer_cache.stats() if answer_cache else None,
+        "blocking_pool": blocking_stats(),
+        "report_flights": _report_flights.stats(),
+        "jobs": job_queue.stats(),
+        "cassette": cassette.stats() if cassette else None,
+    }
+
+
+def _initial_state(company_name: str, force_refresh: bool = False, refresh: Optional[dict] = None) -> dict:
+    return {
+        "company_name": company_name,
+        "news_results": [],
+        "culture_results": [],
+        "tech_results": [],
+        "interview_results": [],
+        "financials_results": [],
+        "all_results": [],
+        "all_records": [],
+        "stage_timings": {},
+        "force_refresh": force_refresh,
+        "report": None,
+        "search_nodes": [],
+        "base_records": [],
+        "base_report": None,
+        "fetched_categories": [],
+        **(refresh or {}),
+    }
 
 
 @app.post("/research")
-def research(request: ResearchRequest):
-    start_time = time.time()
+async def research(request: ResearchRequest):
+    from agents.research_graph import get_research_graph
+    from chains.report_chain import aanswer_query
+    from rag.retriever import retrieve_context
 
-    # 1. Clear stale data
-    try:
-        clear_collection()
-    except Exception as e:
-        logger.error("ChromaDB clear failed: %s", e)
-        raise HTTPException(status_code=500, detail=f"Vector store error: {e}")
+    start_time = time.time()
 
-    # 2. Run LangGraph agent (parallel news/culture/tech/interview → aggregator)
+    # 1. Run LangGraph agent (parallel search nodes → aggregator → ingest)
     try:
-        initial_state = {
-            "company_name": request.company_name,
-            "news_results": [],
-            "culture_results": [],
-            "tech_results": [],
-            "interview_results": [],
-            "financials_results": [],
-            "all_results": [],
-        }
-        final_state = research_graph.invoke(initial_state)
+        final_state = await get_research_graph().ainvoke(_initial_state(request.company_name))
         search_texts = final_state["all_results"]
     except Exception as e:
         logger.error("Agent graph failed for '%s': %s", request.company_name, e)
@@ -85,16 +253,14 @@ def research(request: ResearchRequest):
             detail=f"No web results found for '{request.company_name}'. Check the company name and try again.",
         )
 
-    # 3. Embed into ChromaDB
-    try:
-        chunks_embedded = embed_search_results(request.company_name, search_texts)
-    except Exception as e:
-        logger.error("ChromaDB embed failed: %s", e)
-        raise HTTPException(status_code=500, detail=f"Vector store error: {e}")
+    # 2. Check the incremental sync into this company's namespace
+    if final_state.get("ingest_error"):
+        raise HTTPException(status_code=500, detail=f"Vector store error: {final_state['ingest_error']}")
+    chunks_embedded = final_state["chunks_embedded"]
 
-    # 4. Retrieve relevant context for the query
+    # 3. Retrieve relevant context for the query
     try:
-        context = retrieve_context(request.query)
+        context = await run_blocking(retrieve_context, request.query, company_name=request.company_name)
     except Exception as e:
         logger.error("ChromaDB retrieval failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Vector store error: {e}")
@@ -102,9 +268,9 @@ def research(request: ResearchRequest):
     if not context:
         raise HTTPException(status_code=404, detail="No relevant context found for this query.")
 
-    # 5. Generate answer
+    # 4. Generate answer
     try:
-        answer = answer_query(request.query, context)
+        answer = await aanswer_query(request.query, context)
     except Exception as e:
         logger.error("LLM call failed: %s", e)
         raise HTTPException(status_code=503, detail=f"LLM error: {e}")
@@ -122,49 +288,47 @@ def research(request: ResearchRequest):
     }
 
 
-@app.post("/generate-report")
-def generate_report_endpoint(request: GenerateReportRequest):
-    start_time = time.time()
+async def _iter_report_pipeline(company_name: str, force_refresh: bool = False, refresh: Optional[dict] = None):
+    """Research a company, store the validated report, and return it.
 
-    # 1. Clear stale data
-    try:
-        clear_collection()
-    except Exception as e:
-        logger.error("ChromaDB clear failed: %s", e)
-        raise HTTPException(status_code=500, detail=f"Vector store error: {e}")
+    Yields (node_name, state_update) as each research graph node completes,
+    then ("result", {"report", "sources_found", "stage_timings",
+    "categories_refreshed"}) once the report is validated and stored. Unless
+    `force_refresh` is set, an unchanged source corpus reuses the stored report
+    instead of calling the LLM again. `refresh` (see _refresh_plan) limits the
+    run to the stale categories of a stored company.
+
+    Raises HTTPException on any pipeline failure so endpoints can surface it as-is.
+    """
+    from agents.research_graph import get_research_graph, refreshed_categories
 
-    # 2. Run LangGraph agent (news → culture → tech → interview → aggregator → report_generator)
+    # 1. Run LangGraph agent (parallel search nodes → aggregator → ingest → report_generator)
+    final_state = None
     try:
-        initial_state = {
-            "company_name": request.company_name,
-            "news_results": [],
-            "culture_results": [],
-            "tech_results": [],
-            "interview_results": [],
-            "financials_results": [],
-            "all_results": [],
-            "report": None,
-        }
-        final_state = research_graph.invoke(initial_state)
+        async for mode, chunk in get_research_graph().astream(
+            _initial_state(company_name, force_refresh, refresh), stream_mode=["updates", "values"]
+        ):
+            if mode == "updates":
+                for node, update in chunk.items():
+                    yield node, update or {}
+            else:
+                final_state = chunk
         search_texts = final_state["all_results"]
     except Exception as e:
-        logger.error("Agent graph failed for '%s': %s", request.company_name, e)
+        logger.error("Agent graph failed for '%s': %s", company_name, e)
         raise HTTPException(status_code=503, detail=f"Research agent error: {e}")
 
     if not search_texts:
         raise HTTPException(
             status_code=404,
-            detail=f"No web results found for '{request.company_name}'. Check the company name and try again.",
+            detail=f"No web results found for '{company_name}'. Check the company name and try again.",
         )
 
-    # 3. Embed results into ChromaDB (for follow-up /chat queries)
-    try:
-        embed_search_results(request.company_name, search_texts)
-    except Exception as e:
-        logger.error("ChromaDB embed failed: %s", e)
-        raise HTTPException(status_code=500, detail=f"Vector store error: {e}")
+    # 2. Check the incremental sync into ChromaDB (for follow-up /chat queries)
+    if final_state.get("ingest_error"):
+        raise HTTPException(status_code=500, detail=f"Vector store error: {final_state['ingest_error']}")
 
-    # 4. Return structured report
+    # 3. Validate the structured report
     report = final_state.get("report")
     if report is None:
         raise HTTPException(status_code=500, detail="Report generation failed — no report in agent state.")
@@ -175,49 +339,517 @@ def generate_report_endpoint(request: GenerateReportRequest):
     if not report.overview or any(s in overview_lower for s in _SENTINEL):
         raise HTTPException(
             status_code=404,
-            detail=f"No reliable information found for '{request.company_name}'. Please check the company name and try again.",
+            detail=f"No reliable information found for '{company_name}'. Please check the company name and try again.",
         )
 
-    elapsed = round(time.time() - start_time, 2)
+    # 4. Store for repeat lookups; a validated report also proves the company is real
+    await run_blocking(
+        get_report_store().put, company_name, final_state["corpus_fingerprint"], report, final_state["all_records"]
+    )
+    await run_blocking(get_validity_cache().set, company_name, True)
+
+    yield "result", {
+        "report": report,
+        "sources_found": len(search_texts),
+        "stage_timings": final_state.get("stage_timings", {}),
+        "categories_refreshed": refreshed_categories(final_state),
+    }
+
+
+async def _run_report_pipeline(company_name: str, force_refresh: bool = False, refresh: Optional[dict] = None) -> dict:
+    """Run _iter_report_pipeline to completion and return only the final result."""
+    async for stage, payload in _iter_report_pipeline(company_name, force_refresh, refresh):
+        if stage == "result":
+            return payload
+    raise HTTPException(status_code=500, detail="Report pipeline finished without a result.")
+
+
+# One in-flight pipeline run per company and kind of run (see _flight_key).
+_report_flights: SingleFlight[dict] = SingleFlight()
+
+
+def _flight_key(company_name: str, force_refresh: bool = False, refresh: Optional[dict] = None) -> str:
+    """Key under which pipeline runs are coalesced.
+
+    Callers share a run only if they asked for the same one: a forced rebuild
+    or a partial refresh never joins a plain run it did not start.
+    """
+    key = normalize_company_name(company_name)
+    if force_refresh:
+        key += "|force"
+    if refresh is not None:
+        key += "|refresh:" + ",".join(sorted(refresh["search_nodes"]))
+    return key
+
+
+async def _join_report_flight(key: str, run) -> tuple[dict, bool]:
+    """Await the run in flight under `key`, starting it with `run()` if there is none."""
+    if _report_flights.in_flight(key):
+        REPORT_RUNS_COALESCED.inc()
+    return await _report_flights.do(key, run)
+
+
+async def _run_report_pipeline_shared(
+    company_name: str, force_refresh: bool = False, refresh: Optional[dict] = None
+) -> tuple[dict, bool]:
+    """_run_report_pipeline, coalesced with an identical run already in flight for the same company.
+
+    Returns (result, coalesced). Concurrent callers share one set of searches,
+    one ingestion and one report LLM call; a pipeline error reaches them all.
+    """
+    return await _join_report_flight(
+        _flight_key(company_name, force_refresh, refresh),
+        lambda: _run_report_pipeline(company_name, force_refresh, refresh),
+    )
+
+
+def _refresh_plan(company_name: str, categories: Optional[list[str]] = None) -> Optional[dict]:
+    """Graph state that re-runs only the stale search nodes of a stored company.
+
+    Every stored record is handed to the graph, which replaces a category's
+    records only once its new search returns results, so a failed search
+    keeps what was stored. Sections of the stored report that do not read a
+    refreshed category are kept as they are. `categories` refreshes exactly
+    those categories whatever their age; an empty list refreshes none. The
+    refreshed search nodes bypass the search cache, so every category in the
+    plan is fetched anew. Returns None when the company has to be researched
+    from scratch: no stored report, or one stored before records carried
+    their category. An empty `search_nodes` means nothing needs searching.
+
+    Raises ValueError for a category the research graph does not search.
+    """
+    from agents.research_graph import SEARCH_NODE_CATEGORIES
+    from rag.embeddings import stale_categories
+
+    known = list(SEARCH_NODE_CATEGORIES.values())
+    unknown = sorted(set(categories or ()) - set(known))
+    if unknown:
+        raise ValueError(f"Unknown research categories: {', '.join(unknown)}. Expected any of: {', '.join(known)}.")
+    cached = get_report_store().get(company_name)
+    if cached is None or not cached.records or any(r.get("category") not in known for r in cached.records):
+        return None
+    stale = set(categories if categories is not None else stale_categories(company_name, known))
+    if stale.issuperset(known):
+        # Rebuild the whole report, still from new searches.
+        return {"search_nodes": list(SEARCH_NODE_CATEGORIES), "base_records": list(cached.records), "base_report": None}
+    return {
+        "search_nodes": [node for node, category in SEARCH_NODE_CATEGORIES.items() if category in stale],
+        "base_records": list(cached.records),
+        "base_report": cached.report,
+    }
+
+
+async def _refresh_report(company_name: str, categories: Optional[list[str]] = None) -> Optional[dict]:
+    """Bring a company's report up to date, searching only its stale categories.
+
+    Returns the pipeline result, or None when every category is still fresh;
+    the stored report is then re-stamped as current instead.
+    """
+    refresh = await run_blocking(_refresh_plan, company_name, categories)
+    if refresh is not None and not refresh["search_nodes"]:
+        await run_blocking(get_report_store().touch, company_name)
+        return None
+    result, _ = await _run_report_pipeline_shared(company_name, refresh=refresh)
+    return result
+
+
+async def _refresh_report_in_background(company_name: str) -> None:
+    try:
+        await _refresh_report(company_name)
+        logger.info("Background refresh finished for '%s'", company_name)
+    except Exception as e:
+        logger.warning("Background refresh failed for '%s': %s", company_name, e)
+    finally:
+        get_report_store().release_refresh(company_name)
+
+
+# Refreshes started outside a response's BackgroundTasks; held so they are
+# not garbage-collected before they finish.
+_detached_refreshes: set[asyncio.Task] = set()
+
+
+def _start_refresh_in_background(company_name: str) -> None:
+    task = asyncio.create_task(_refresh_report_in_background(company_name))
+    _detached_refreshes.add(task)
+    task.add_done_callback(_detached_refreshes.discard)
+
+
+def _ensure_chat_corpus(company_name: str, records: list[dict]) -> None:
+    """Re-embed a cached report's source records if /chat has nothing to retrieve for it."""
+    from rag.embeddings import embed_search_records, namespace_chunk_count
+
+    if namespace_chunk_count(company_name) > 0:
+        return
+    embed_search_records(company_name, records)
+
+
+async def _cached_report_response(
+    request: GenerateReportRequest, background_tasks: Optional[BackgroundTasks], start_time: float
+) -> Optional[dict]:
+    """Response body for a servable cached report, or None if the pipeline must run.
+
+    A stale report is returned immediately and refreshed once in the background:
+    after the response when `background_tasks` is given, otherwise in a task
+    started right away. Long streams pass None, since their background tasks
+    only run once the last line is sent, and never if the client goes away.
+    """
+    if request.force_refresh:
+        return None
+    store = get_report_store()
+    cached = await run_blocking(store.get, request.company_name)
+    record_cache_lookup("report", hit=cached is not None and cached.is_servable)
+    if cached is None or not cached.is_servable:
+        return None
+
+    stale = not cached.is_fresh
+    if stale and store.claim_refresh(request.company_name):
+        if background_tasks is not None:
+            background_tasks.add_task(_refresh_report_in_background, request.company_name)
+        else:
+            _start_refresh_in_background(request.company_name)
+    try:
+        await run_blocking(_ensure_chat_corpus, request.company_name, cached.records)
+    except Exception as e:
+        logger.error("ChromaDB embed failed for cached report: %s", e)
 
     return {
         "status": "ok",
         "company": request.company_name,
-        "sources_found": len(search_texts),
-        "execution_time_s": elapsed,
-        "report": report.model_dump(),
+        "sources_found": len(cached.sources),
+        "execution_time_s": round(time.time() - start_time, 2),
+        "cached": True,
+        "stale": stale,
+        "coalesced": False,
+        "report": cached.report.model_dump(),
     }
 
 
-@app.post("/chat")
-def chat(request: ChatRequest):
-    # 1. Validate the company is real before doing anything else
-    if not is_real_company(request.company_name):
-        return {
-            "status": "ok",
-            "company": request.company_name,
-            "question": request.question,
-            "answer": (
-                f"'{request.company_name}' does not appear to be a real company. "
-                f"Please go back and search for a valid company name."
-            ),
-        }
+def _report_response(company_name: str, result: dict, start_time: float, coalesced: bool = False) -> dict:
+    return {
+        "status": "ok",
+        "company": company_name,
+        "sources_found": result["sources_found"],
+        "execution_time_s": round(time.time() - start_time, 2),
+        "cached": False,
+        "stale": False,
+        "coalesced": coalesced,
+        "report": result["report"].model_dump(),
+    }
 
-    # 2. Validate that research data exists in ChromaDB
-    if get_collection().count() == 0:
-        return {
-            "status": "ok",
-            "company": request.company_name,
-            "question": request.question,
-            "answer": (
-                f"My research session for {request.company_name} has expired (the server restarted). "
-                f"Please go back and run a new search to reload the data, then ask again."
-            ),
-        }
 
-    # 3. Retrieve relevant context for the question
+@app.post("/generate-report")
+async def generate_report_endpoint(request: GenerateReportRequest, background_tasks: BackgroundTasks):
+    start_time = time.time()
+
+    # Serve from the report cache unless the caller forces a rebuild
+    cached_response = await _cached_report_response(request, background_tasks, start_time)
+    if cached_response is not None:
+        return cached_response
+
+    result, coalesced = await _run_report_pipeline_shared(request.company_name, force_refresh=request.force_refresh)
+    return _report_response(request.company_name, result, start_time, coalesced)
+
+
+@app.post("/refresh")
+async def refresh_report_endpoint(request: RefreshRequest):
+    """Update a company's report, re-searching only categories whose corpus is stale.
+
+    Fresh categories keep their stored chunks; the refreshed ones are replaced
+    and only the report sections that depend on them are regenerated. A company
+    with no stored report is researched from scratch.
+    """
+    start_time = time.time()
+    try:
+        result = await _refresh_report(request.company_name, request.categories)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if result is not None:
+        body = _report_response(request.company_name, result, start_time)
+        return {**body, "categories_refreshed": result["categories_refreshed"]}
+
+    cached = await run_blocking(get_report_store().get, request.company_name)
+    return {
+        "status": "ok",
+        "company": request.company_name,
+        "sources_found": len(cached.sources),
+        "execution_time_s": round(time.time() - start_time, 2),
+        "cached": True,
+        "stale": False,
+        "coalesced": False,
+        "categories_refreshed": [],
+        "report": cached.report.model_dump(),
+    }
+
+
+async def _run_research_job(job: Job) -> dict:
+    start_time = time.time()
+    result, coalesced = await _run_report_pipeline_shared(job.company_name, force_refresh=job.force_refresh)
+    return _report_response(job.company_name, result, start_time, coalesced)
+
+
+job_queue = JobQueue(_run_research_job)
+JOB_QUEUE_DEPTH.set_function(job_queue.depth)
+
+
+@app.post("/jobs/research", status_code=202)
+async def submit_research_job(request: ResearchJobRequest):
+    """Queue a report run and return immediately; poll GET /jobs/{job_id} for the outcome.
+
+    The run is independent of this connection, so proxy timeouts and client
+    disconnects do not waste it.
+    """
+    try:
+        job = await job_queue.submit(request.company_name, request.priority, request.force_refresh)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "priority": request.priority,
+        "status_url": f"/jobs/{job.id}",
+    }
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'.")
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "company": job.company_name,
+        "priority": job.priority_name,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "attempts": job.attempts,
+        "result": job.result,
+        "error": job.error,
+        "status_code": job.status_code,
+    }
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _report_progress_events(request: GenerateReportRequest, start_time: float):
+    """Translate research graph progress into server-sent events.
+
+    Emits `node` per completed search/ingest/report node, `aggregate` with the
+    aggregation stats, then `report` with the same body as /generate-report,
+    or `error` if the pipeline fails. The run is registered in _report_flights
+    so other requests for the company join it; a stream that itself joined
+    another request's run only emits the outcome.
+    """
+    from agents.research_graph import SEARCH_NODE_CATEGORIES, SEARCH_NODES
+
+    progress: asyncio.Queue = asyncio.Queue()
+
+    async def run() -> dict:
+        async for stage, payload in _iter_report_pipeline(request.company_name, request.force_refresh):
+            if stage == "result":
+                return payload
+            progress.put_nowait((stage, payload))
+        raise HTTPException(status_code=500, detail="Report pipeline finished without a result.")
+
+    flight = asyncio.ensure_future(_join_report_flight(_flight_key(request.company_name, request.force_refresh), run))
+    flight.add_done_callback(lambda _: progress.put_nowait(None))
+    try:
+        while (item := await progress.get()) is not None:
+            stage, payload = item
+            elapsed = payload.get("stage_timings", {}).get(stage)
+            if stage in SEARCH_NODES:
+                yield _sse("node", {
+                    "node": stage,
+                    "category": SEARCH_NODE_CATEGORIES[stage],
+                    "result_count": len(payload.get(f"{stage}_results", [])),
+                    "elapsed_s": elapsed,
+                })
+            elif stage == "aggregator":
+                yield _sse("aggregate", {**payload.get("aggregation_stats", {}), "elapsed_s": elapsed})
+            elif stage == "ingest":
+                yield _sse("node", {
+                    "node": stage,
+                    "chunks_embedded": payload.get("chunks_embedded", 0),
+                    "elapsed_s": elapsed,
+                })
+            else:
+                yield _sse("node", {"node": stage, "elapsed_s": elapsed})
+        try:
+            result, coalesced = await flight
+        except HTTPException as e:
+            yield _sse("error", {"status_code": e.status_code, "detail": e.detail})
+            return
+        body = _report_response(request.company_name, result, start_time, coalesced)
+        yield _sse("report", {**body, "stage_timings": result["stage_timings"]})
+    finally:
+        # A closed connection stops the run unless other requests joined it.
+        flight.cancel()
+
+
+@app.post("/generate-report/stream")
+async def generate_report_stream(request: GenerateReportRequest, background_tasks: BackgroundTasks):
+    """Server-sent-events variant of /generate-report that reports progress per graph node.
+
+    Closing the connection cancels the running graph, including in-flight
+    search and LLM calls, unless other requests have joined the run. If the
+    same run is already in flight the stream joins it and only emits the
+    final `report` (or `error`) event.
+    """
+    start_time = time.time()
+
+    cached_response = await _cached_report_response(request, background_tasks, start_time)
+    if cached_response is not None:
+        events = iter([_sse("report", cached_response)])
+    else:
+        events = _report_progress_events(request, start_time)
+
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _batch_report_line(index: int, company_name: str, force_refresh: bool, slots: asyncio.Semaphore) -> dict:
+    """One NDJSON line for a batch entry: the /generate-report body, or the error that company hit."""
+    async with slots:
+        start_time = time.time()
+        request = GenerateReportRequest(company_name=company_name, force_refresh=force_refresh)
+        try:
+            body = await _cached_report_response(request, None, start_time)
+            if body is None:
+                result, coalesced = await _run_report_pipeline_shared(company_name, force_refresh)
+                body = _report_response(company_name, result, start_time, coalesced)
+        except HTTPException as e:
+            return {"type": "error", "index": index, "company": company_name, "status_code": e.status_code, "detail": e.detail}
+        except Exception as e:
+            logger.exception("Batch report failed for '%s'", company_name)
+            return {"type": "error", "index": index, "company": company_name, "status_code": 500, "detail": str(e)}
+    return {"type": "report", "index": index, **body}
+
+
+async def _batch_report_lines(request: BatchReportRequest):
+    """NDJSON lines in completion order, then a summary line.
+
+    Closing the connection cancels every company still queued or running.
+    """
+    start_time = time.time()
+    slots = asyncio.Semaphore(min(request.concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY))
+    tasks = [
+        asyncio.ensure_future(_batch_report_line(i, company, request.force_refresh, slots))
+        for i, company in enumerate(request.companies)
+    ]
+    succeeded = 0
+    try:
+        for finished in asyncio.as_completed(tasks):
+            line = await finished
+            succeeded += line["type"] == "report"
+            yield json.dumps(line, default=str) + "\n"
+        yield json.dumps({
+            "type": "summary",
+            "companies": len(tasks),
+            "succeeded": succeeded,
+            "failed": len(tasks) - succeeded,
+            "execution_time_s": round(time.time() - start_time, 2),
+        }) + "\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+@app.post("/batch/reports")
+async def batch_reports(request: BatchReportRequest):
+    """Generate reports for a list of companies, streaming each as NDJSON when it finishes.
+
+    Up to BATCH_CONCURRENCY companies run at once; searches and LLM calls
+    still draw from the process-wide rate limiters, and duplicate names share
+    one pipeline run. A failing company yields an `error` line without
+    affecting the rest.
+    """
+    return StreamingResponse(
+        _batch_report_lines(request),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _lookup_answer(request: ChatRequest):
+    """Embed the question and look it up in the semantic answer cache.
+
+    Returns (cached_answer, probe); the probe stores the generated answer on
+    a miss. Both are None when the cache is disabled.
+    """
+    from chains.answer_cache import get_answer_cache
+    from rag.embedders import get_embedder
+    from rag.embeddings import get_namespace
+
+    cache = get_answer_cache()
+    namespace = get_namespace(request.company_name)
+    if cache is None or namespace is None:
+        return None, None
+    # Any re-ingestion bumps the version; ingested_at tells a recreated namespace apart.
+    corpus_version = f"{namespace.collection_name}:{namespace.version}:{namespace.ingested_at}"
+    vector = get_embedder().embed_query(request.question)
+    probe = cache.probe(request.company_name, corpus_version, request.category, request.question, vector)
+    return cache.get(probe), probe
+
+
+def _remember_answer(probe, answer: str) -> None:
+    from chains.answer_cache import get_answer_cache
+
+    if probe is not None and answer:
+        get_answer_cache().put(probe, answer)
+
+
+async def _chat_preflight(request: ChatRequest) -> tuple[Optional[str], list[str], object]:
+    """Checks shared by /chat and /chat/stream.
+
+    Returns (answer, [], None) when the question is answered without the LLM:
+    a canned reply, or a cached answer to a similar earlier question.
+    Otherwise returns (None, context_chunks, probe), where the probe (None if
+    the answer cache is unavailable) goes to _remember_answer along with the
+    generated answer. Raises HTTPException on errors.
+    """
+    from chains.report_chain import ais_real_company
+    from rag.embeddings import namespace_chunk_count
+    from rag.retriever import retrieve_context
+
+    # 1. Validate the company is real before doing anything else
+    if not await ais_real_company(request.company_name):
+        return (
+            f"'{request.company_name}' does not appear to be a real company. "
+            f"Please go back and search for a valid company name."
+        ), [], None
+
+    # 2. Validate that research data exists in this company's namespace
+    if await run_blocking(namespace_chunk_count, request.company_name) == 0:
+        return (
+            f"My research session for {request.company_name} has expired (the server restarted). "
+            f"Please go back and run a new search to reload the data, then ask again."
+        ), [], None
+
+    # 3. Reuse the answer to a near-identical question about the same corpus
     try:
-        context = retrieve_context(request.question, k=3, company_name=request.company_name)
+        cached_answer, probe = await run_blocking(_lookup_answer, request)
+    except Exception as e:
+        logger.warning("Answer cache lookup failed for '%s': %s", request.company_name, e)
+        cached_answer, probe = None, None
+    if cached_answer is not None:
+        return cached_answer, [], None
+
+    # 4. Retrieve relevant context for the question
+    try:
+        context = await run_blocking(
+            retrieve_context,
+            request.question,
+            k=3,
+            company_name=request.company_name,
+            category=request.category,
+            query_embedding=probe.vector.tolist() if probe is not None else None,
+        )
     except Exception as e:
         logger.error("ChromaDB retrieval failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Vector store error: {e}")
@@ -225,12 +857,29 @@ def chat(request: ChatRequest):
     if not context:
         raise HTTPException(status_code=404, detail="No relevant context found for this question.")
 
-    # 4. Generate answer from context
+    return None, context, probe
+
+
+@app.post("/chat")
+async def chat(request: ChatRequest):
+    from chains.report_chain import aanswer_query
+
+    canned_answer, context, probe = await _chat_preflight(request)
+    if canned_answer is not None:
+        return {
+            "status": "ok",
+            "company": request.company_name,
+            "question": request.question,
+            "answer": canned_answer,
+        }
+
+    # 5. Generate answer from context
     try:
-        answer = answer_query(request.question, context, company_name=request.company_name)
+        answer = await aanswer_query(request.question, context, company_name=request.company_name)
     except Exception as e:
         logger.error("LLM call failed: %s", e)
         raise HTTPException(status_code=503, detail=f"LLM error: {e}")
+    _remember_answer(probe, answer)
 
     return {
         "status": "ok",
@@ -238,3 +887,59 @@ def chat(request: ChatRequest):
         "question": request.question,
         "answer": answer,
     }
+
+
+async def _single_token(text: str):
+    yield text
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request):
+    """Server-sent-events variant of /chat that forwards tokens as the model emits them.
+
+    Emits `token` events ({"text"}), then `done` with time-to-first-token and
+    total latency, or `error` if the LLM fails mid-stream. Generation stops as
+    soon as the client disconnects.
+    """
+    from chains.report_chain import astream_answer
+
+    start = time.perf_counter()
+    canned_answer, context, probe = await _chat_preflight(request)
+
+    async def events():
+        ttft_ms = None
+        token_count = 0
+        parts = []
+        try:
+            if canned_answer is not None:
+                tokens = _single_token(canned_answer)
+            else:
+                tokens = astream_answer(request.question, context, company_name=request.company_name)
+            async for token in tokens:
+                if await http_request.is_disconnected():
+                    logger.info("Client disconnected — stopping chat stream for '%s'", request.company_name)
+                    return
+                if ttft_ms is None:
+                    ttft_ms = round((time.perf_counter() - start) * 1000, 1)
+                token_count += 1
+                parts.append(token)
+                yield _sse("token", {"text": token})
+        except Exception as e:
+            logger.error("LLM stream failed: %s", e)
+            yield _sse("error", {"status_code": 503, "detail": f"LLM error: {e}"})
+            return
+        _remember_answer(probe, "".join(parts))
+        yield _sse("done", {
+            "status": "ok",
+            "company": request.company_name,
+            "question": request.question,
+            "ttft_ms": ttft_ms,
+            "total_ms": round((time.perf_counter() - start) * 1000, 1),
+            "chunks": token_count,
+        })
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,99 @@
+import heapq
+import math
+import threading
+from collections import Counter, defaultdict
+from typing import Optional
+
+from .text import tokenize
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+class BM25Index:
+    """In-memory Okapi BM25 inverted index over one company's chunks.
+
+    Exact-term matching complements dense retrieval for tickers, framework
+    names and funding-round labels that embeddings tend to blur.
+    """
+
+    def __init__(self, ids: list[str], documents: list[str], categories: Optional[list] = None):
+        self.ids = ids
+        self.documents = documents
+        self.categories = categories or [None] * len(documents)
+        self._postings: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self._doc_lengths = []
+        for doc_index, doc in enumerate(documents):
+            terms = Counter(tokenize(doc))
+            self._doc_lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self._postings[term].append((doc_index, tf))
+        n = len(documents)
+        self._avg_length = (sum(self._doc_lengths) / n) if n else 0.0
+        self._idf = {
+            term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def search(self, query: str, top_n: int, category: Optional[str] = None) -> list[tuple[str, str, float]]:
+        """Return up to top_n (id, document, score) tuples, best first, optionally from one category."""
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for doc_index, tf in self._postings[term]:
+                if category is not None and self.categories[doc_index] != category:
+                    continue
+                norm = 1 - BM25_B + BM25_B * self._doc_lengths[doc_index] / (self._avg_length or 1.0)
+                scores[doc_index] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+        best = heapq.nlargest(top_n, scores.items(), key=lambda item: item[1])
+        return [(self.ids[i], self.documents[i], score) for i, score in best]
+
+
+class BM25Store:
+    """Per-namespace BM25 indexes, rebuilt whenever the namespace's ingestion version moves."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes: dict[str, tuple[int, BM25Index]] = {}
+
+    def get(self, collection_name: str, version: int):
+        with self._lock:
+            entry = self._indexes.get(collection_name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        return None
+
+    def put(
+        self,
+        collection_name: str,
+        version: int,
+        ids: list[str],
+        documents: list[str],
+        categories: Optional[list] = None,
+    ) -> BM25Index:
+        index = BM25Index(ids, documents, categories)
+        with self._lock:
+            self._indexes[collection_name] = (version, index)
+        return index
+
+    def discard(self, collection_name: str) -> None:
+        with self._lock:
+            self._indexes.pop(collection_name, None)
+
+
+_store = BM25Store()
+
+
+def get_bm25_store() -> BM25Store:
+    return _store
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[str]:
+    """Fuse ranked id lists: each id scores sum(1 / (k + rank)) over the lists it appears in."""
+    scores: dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores, key=scores.get, reverse=True)
@@ -0,0 +1,95 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import Iterator
+
+try:
+    from core.tokens import count_tokens
+except ModuleNotFoundError:
+    from backend.core.tokens import count_tokens
+
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "300"))
+# Trailing sentences of one chunk repeated at the start of the next, up to this many tokens.
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))
+
+# A sentence ends at . ! or ? (optionally followed by a closing quote or
+# bracket) and whitespace; abbreviations such as "Inc." occasionally split
+# early, which only makes a chunk boundary slightly less tidy.
+_SENTENCE_END = re.compile(r"(?<=[.!?])([\"')\]]*)\s+")
+_WORD = re.compile(r"\S+")
+
+
+@dataclass
+class Chunk:
+    text: str
+    # Character offsets of the chunk within the source text.
+    start: int
+    end: int
+    index: int
+
+
+def _sentences(text: str) -> Iterator[tuple[int, int]]:
+    """Yield (start, end) character spans of the sentences in text."""
+    start = len(text) - len(text.lstrip())
+    for match in _SENTENCE_END.finditer(text):
+        if match.end(1) > start:
+            yield start, match.end(1)
+        start = match.end()
+    if start < len(text) and text[start:].strip():
+        yield start, len(text.rstrip())
+
+
+def _pieces(text: str, max_tokens: int) -> Iterator[tuple[int, int, int]]:
+    """Yield (start, end, tokens) spans no larger than max_tokens, split at sentences where possible."""
+    for start, end in _sentences(text):
+        tokens = count_tokens(text[start:end])
+        if tokens <= max_tokens:
+            yield start, end, tokens
+            continue
+        # A single sentence longer than a chunk: fall back to word windows.
+        piece_start = piece_end = None
+        piece_tokens = 0
+        for word in _WORD.finditer(text, start, end):
+            word_tokens = count_tokens(word.group() + " ")
+            if piece_start is not None and piece_tokens + word_tokens > max_tokens:
+                yield piece_start, piece_end, piece_tokens
+                piece_start, piece_tokens = None, 0
+            if piece_start is None:
+                piece_start = word.start()
+            piece_end = word.end()
+            piece_tokens += word_tokens
+        if piece_start is not None:
+            yield piece_start, piece_end, piece_tokens
+
+
+def iter_chunks(
+    text: str,
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+) -> Iterator[Chunk]:
+    """Split text into sentence-aligned chunks of at most max_tokens model tokens.
+
+    Sentences are packed greedily; when a chunk is full, its trailing
+    sentences totalling at most overlap_tokens open the next chunk so context
+    spanning a boundary is retrievable from either side. Chunks are yielded
+    as they are completed, so long inputs are never fully materialized.
+    """
+    window: list[tuple[int, int, int]] = []
+    window_tokens = 0
+    index = 0
+    for piece in _pieces(text, max_tokens):
+        if window and window_tokens + piece[2] > max_tokens:
+            yield Chunk(text[window[0][0] : window[-1][1]], window[0][0], window[-1][1], index)
+            index += 1
+            carried: list[tuple[int, int, int]] = []
+            carried_tokens = 0
+            for prior in reversed(window[1:]):
+                if carried_tokens + prior[2] > overlap_tokens or carried_tokens + prior[2] + piece[2] > max_tokens:
+                    break
+                carried.insert(0, prior)
+                carried_tokens += prior[2]
+            window, window_tokens = carried, carried_tokens
+        window.append(piece)
+        window_tokens += piece[2]
+    if window:
+        yield Chunk(text[window[0][0] : window[-1][1]], window[0][0], window[-1][1], index)
@@ -0,0 +1,161 @@
+import hashlib
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Dict
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils.embedding_functions import register_embedding_function
+
+from .text import tokenize
+
+try:
+    from core.cassette import create_http_client, get_cassette
+    from core.metrics import EMBEDDING_BATCH_SECONDS, EMBEDDING_TEXTS
+except ModuleNotFoundError:
+    from backend.core.cassette import create_http_client, get_cassette
+    from backend.core.metrics import EMBEDDING_BATCH_SECONDS, EMBEDDING_TEXTS
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai").lower()
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "512"))
+OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+
+
+class Embedder(ABC):
+    """Turns text into fixed-size vectors.
+
+    `name` identifies the vector space: embedding caches and vector namespaces
+    are keyed by it, so vectors from different backends are never mixed.
+    """
+
+    name: str
+
+    @abstractmethod
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]: ...
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """Embed documents in batches of EMBEDDING_BATCH_SIZE."""
+        vectors = []
+        for start in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+            vectors.extend(self._timed_batch(texts[start : start + EMBEDDING_BATCH_SIZE]))
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._timed_batch([text])[0]
+
+    def _timed_batch(self, texts: list[str]) -> list[list[float]]:
+        t0 = time.perf_counter()
+        vectors = self._embed_batch(texts)
+        EMBEDDING_BATCH_SECONDS.labels(self.name).observe(time.perf_counter() - t0)
+        EMBEDDING_TEXTS.labels(self.name).inc(len(texts))
+        return vectors
+
+
+class OpenAIEmbedder(Embedder):
+    """Remote embeddings from the OpenAI API (one round trip per batch)."""
+
+    def __init__(self, model: str = OPENAI_EMBEDDING_MODEL):
+        self.model = model
+        self.name = f"openai:{model}"
+        self._client = None
+
+    def _get_client(self):
+        if self._client is None:
+            from openai import OpenAI
+
+            # Only replace the SDK's own HTTP client when recording or replaying.
+            http_client = create_http_client() if get_cassette() is not None else None
+            self._client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), http_client=http_client)
+        return self._client
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        response = self._get_client().embeddings.create(model=self.model, input=texts)
+        return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+
+
+@lru_cache(maxsize=200_000)
+def _hash_feature(feature: str, dim: int) -> tuple[int, float]:
+    """Deterministic (bucket, sign) for a feature; Python's hash() is salted per process."""
+    h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+    return h % dim, (1.0 if h >> 63 else -1.0)
+
+
+class HashingEmbedder(Embedder):
+    """Local, CPU-only embedder using signed feature hashing over word uni- and bigrams.
+
+    Needs no model download or network access. Term counts are scaled
+    sublinearly and rows are L2-normalized, so cosine and L2 rankings agree.
+    """
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hashing-v1:{dim}"
+
+    @staticmethod
+    def _features(text: str) -> list[str]:
+        tokens = tokenize(text)
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def _embed_batch(self, texts: list[str]) -> list[list[float]]:
+        rows, cols, signs = [], [], []
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                col, sign = _hash_feature(feature, self.dim)
+                rows.append(row)
+                cols.append(col)
+                signs.append(sign)
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        np.add.at(matrix, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), signs)
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).tolist()
+
+
+_BACKENDS = {
+    "openai": OpenAIEmbedder,
+    "hashing": HashingEmbedder,
+}
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder() -> Embedder:
+    """Return the process-wide embedder selected by EMBEDDING_BACKEND (openai | hashing)."""
+    global _embedder
+    if _embedder is None:
+        with _embedder_lock:
+            if _embedder is None:
+                if EMBEDDING_BACKEND not in _BACKENDS:
+                    raise ValueError(
+                        f"Unknown EMBEDDING_BACKEND '{EMBEDDING_BACKEND}'; expected one of {sorted(_BACKENDS)}"
+                    )
+                _embedder = _BACKENDS[EMBEDDING_BACKEND]()
+    return _embedder
+
+
+@register_embedding_function
+class ChromaEmbedderFunction(EmbeddingFunction[Documents]):
+    """Adapter exposing the configured Embedder to ChromaDB collections."""
+
+    def __init__(self, embedder: Embedder = None):
+        self.embedder = embedder or get_embedder()
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return [np.asarray(v, dtype=np.float32) for v in self.embedder.embed(list(input))]
+
+    @staticmethod
+    def name() -> str:
+        return "company-research-embedder"
+
+    def get_config(self) -> Dict[str, Any]:
+        return {"embedder": self.embedder.name}
+
+    @staticmethod
+    def build_from_config(config: Dict[str, Any]) -> "ChromaEmbedderFunction":
+        return ChromaEmbedderFunction()
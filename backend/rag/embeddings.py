@@ -1,5 +1,9 @@
+import logging
 import sys
 import os
+import threading
+import time
+from typing import Optional
 from dotenv import load_dotenv
 
 load_dotenv(override=True)
@@ -39,14 +43,25 @@ if sys.version_info >= (3, 14):
 
 from dotenv import load_dotenv
 import chromadb
-from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
 
 load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), "../.env"), override=True)
 
+from .embedders import ChromaEmbedderFunction, get_embedder
+from .embedding_cache import content_hash, get_embedding_cache
+from .bm25 import get_bm25_store
+from .chunker import CHUNK_MAX_TOKENS, iter_chunks
+from .namespaces import CATEGORY_TTLS, NAMESPACE_MAX_CHUNKS, Namespace, NamespaceRegistry, collection_name_for
+
+logger = logging.getLogger(__name__)
+
 CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", "./chroma_db")
 
 _client = None
-_collection = None
+_registry = None
+_collections: dict[str, chromadb.Collection] = {}
+_lock = threading.Lock()
+# One lock per namespace, serialising syncs into it (see sync_documents).
+_sync_locks: dict[str, threading.Lock] = {}
 
 
 def _get_client() -> chromadb.PersistentClient:
@@ -56,68 +71,250 @@ def _get_client() -> chromadb.PersistentClient:
     return _client
 
 
-def get_collection() -> chromadb.Collection:
-    global _collection
-    if _collection is None:
-        client = _get_client()
-        embedding_fn = OpenAIEmbeddingFunction(
-            api_key=os.getenv("OPENAI_API_KEY"),
-            model_name="text-embedding-3-small",
+def get_registry() -> NamespaceRegistry:
+    global _registry
+    if _registry is None:
+        _registry = NamespaceRegistry(os.path.join(CHROMA_PERSIST_DIR, "namespaces.db"))
+    return _registry
+
+
+def open_vector_store() -> None:
+    """Open the Chroma client, namespace registry and embedder ahead of first use."""
+    with _lock:
+        _get_client()
+    get_registry()
+    get_embedder()
+
+
+def _collection_name(company_name: str) -> str:
+    return collection_name_for(company_name, get_embedder().name)
+
+
+def _sync_lock(collection_name: str) -> threading.Lock:
+    with _lock:
+        return _sync_locks.setdefault(collection_name, threading.Lock())
+
+
+def get_collection(company_name: str) -> chromadb.Collection:
+    """Return (creating if needed) the vector namespace for one company."""
+    name = _collection_name(company_name)
+    with _lock:
+        collection = _collections.get(name)
+        if collection is None:
+            collection = _get_client().get_or_create_collection(
+                name=name,
+                embedding_function=ChromaEmbedderFunction(get_embedder()),
+            )
+            _collections[name] = collection
+    get_registry().touch(name)
+    return collection
+
+
+def _drop_namespace(collection_name: str) -> None:
+    with _lock:
+        _collections.pop(collection_name, None)
+        try:
+            _get_client().delete_collection(collection_name)
+        except Exception:
+            # Already gone (e.g. deleted by another worker) — only bookkeeping left.
+            pass
+    get_registry().remove(collection_name)
+    get_bm25_store().discard(collection_name)
+
+
+def get_namespace(company_name: str) -> Optional[Namespace]:
+    """Registry entry for a company's live namespace, or None if it has none.
+
+    An expired namespace is dropped on sight and reported as missing.
+    """
+    name = _collection_name(company_name)
+    namespace = get_registry().get(name)
+    if namespace is None:
+        return None
+    if namespace.is_expired:
+        _drop_namespace(name)
+        return None
+    return namespace
+
+
+def namespace_chunk_count(company_name: str) -> int:
+    """Number of chunks stored for a company, or 0 if it has no live namespace."""
+    namespace = get_namespace(company_name)
+    return namespace.chunk_count if namespace else 0
+
+
+def record_category_refresh(company_name: str, categories: list[str]) -> None:
+    """Mark research categories as freshly searched for a company's namespace."""
+    get_registry().record_refresh(_collection_name(company_name), categories)
+
+
+def stale_categories(company_name: str, categories: list[str]) -> list[str]:
+    """The categories whose stored chunks are older than their CORPUS_TTL_<CATEGORY>.
+
+    Every category counts as stale for a company with no live namespace.
+    """
+    namespace = get_namespace(company_name)
+    if namespace is None:
+        return list(categories)
+    refreshed = get_registry().refreshed_at(namespace.collection_name)
+    now = time.time()
+    return [
+        category
+        for category in categories
+        if now - refreshed.get(category, 0.0) > CATEGORY_TTLS.get(category, CATEGORY_TTLS["default"])
+    ]
+
+
+def clear_namespace(company_name: str) -> None:
+    """Delete every vector stored for one company. Other companies are untouched."""
+    _drop_namespace(_collection_name(company_name))
+
+
+def evict_namespaces(keep_company: str = "") -> list[str]:
+    """Drop expired namespaces, then least recently used ones until under the size caps."""
+    keep = _collection_name(keep_company) if keep_company else ""
+    victims = get_registry().eviction_candidates(keep=keep)
+    for name in victims:
+        _drop_namespace(name)
+    return victims
+
+
+def chunk_text(text: str, max_tokens: int = CHUNK_MAX_TOKENS) -> list[str]:
+    """Split text into sentence-aligned, overlapping chunks of at most max_tokens tokens."""
+    return [chunk.text for chunk in iter_chunks(text, max_tokens)]
+
+
+def _embed_with_cache(texts: list[str], hashes: list[str]) -> list[list[float]]:
+    """Embed texts, sending only those never seen before to the embedding API."""
+    embedder = get_embedder()
+    cache = get_embedding_cache()
+    cached = cache.get_many(embedder.name, hashes)
+    missing = [(h, t) for h, t in zip(hashes, texts) if h not in cached]
+    if missing:
+        fresh = embedder.embed([t for _, t in missing])
+        new_vectors = {h: [float(x) for x in v] for (h, _), v in zip(missing, fresh)}
+        cache.put_many(embedder.name, new_vectors)
+        cached.update(new_vectors)
+    return [cached[h] for h in hashes]
+
+
+def sync_documents(company_name: str, documents: list[str], metadatas: list[dict]) -> dict:
+    """Make a company's namespace hold exactly `documents`, touching only the difference.
+
+    Chunk ids are content hashes, so unchanged chunks are left in place, chunks
+    that disappeared are deleted, and only never-stored chunks are upserted.
+    Their vectors come from the embedding cache where possible. Kept chunks
+    whose metadata changed (e.g. now found by another category) get the new
+    metadata without being re-embedded.
+
+    Only the first NAMESPACE_MAX_CHUNKS distinct chunks, in `documents` order,
+    are stored; callers put the chunks they care most about first. Syncs into
+    the same namespace run one at a time; the last one wins.
+
+    Returns counts of chunks kept, added, removed, relabelled and truncated.
+    """
+    by_id: dict[str, tuple[str, dict]] = {}
+    for doc, meta in zip(documents, metadatas):
+        by_id.setdefault(content_hash(doc), (doc, meta))
+    ids = list(by_id)[:NAMESPACE_MAX_CHUNKS]
+    truncated = len(by_id) - len(ids)
+    if truncated:
+        logger.warning(
+            "Namespace for '%s' is capped at %d chunks; dropped the last %d of %d",
+            company_name, NAMESPACE_MAX_CHUNKS, truncated, len(by_id),
         )
-        _collection = client.get_or_create_collection(
-            name="company_data",
-            embedding_function=embedding_fn,
+
+    # Concurrent runs for one company (plain, forced, refresh) each diff against
+    # their own snapshot, so the diff-and-write must not interleave.
+    with _sync_lock(_collection_name(company_name)):
+        collection = get_collection(company_name)
+        stored = collection.get(include=["metadatas"])
+        existing = dict(zip(stored["ids"], stored["metadatas"] or [{}] * len(stored["ids"])))
+        wanted = set(ids)
+        removed = [i for i in existing if i not in wanted]
+        added = [i for i in ids if i not in existing]
+        relabelled = [i for i in ids if i in existing and (existing[i] or {}) != by_id[i][1]]
+
+        if removed:
+            collection.delete(ids=removed)
+        if relabelled:
+            collection.update(ids=relabelled, metadatas=[by_id[i][1] for i in relabelled])
+        if added:
+            docs = [by_id[i][0] for i in added]
+            collection.upsert(
+                ids=added,
+                documents=docs,
+                metadatas=[by_id[i][1] for i in added],
+                embeddings=_embed_with_cache(docs, added),
+            )
+
+        registry = get_registry()
+        registry.record_ingest(collection.name, company_name, len(ids))
+        # Rebuild the lexical index from the final chunk set so hybrid retrieval
+        # never sees a stale view of this namespace.
+        get_bm25_store().put(
+            collection.name,
+            registry.get(collection.name).version,
+            ids,
+            [by_id[i][0] for i in ids],
+            [by_id[i][1].get("category") for i in ids],
         )
-    return _collection
+    evict_namespaces(keep_company=company_name)
+    stats = {
+        "total": len(ids),
+        "kept": len(ids) - len(added),
+        "added": len(added),
+        "removed": len(removed),
+        "relabelled": len(relabelled),
+        "truncated": truncated,
+    }
+    logger.info("Synced namespace for '%s': %s", company_name, stats)
+    return stats
 
 
-def chunk_text(text: str, max_words: int = 250) -> list[str]:
-    """Split text into chunks of at most max_words words."""
-    words = text.split()
-    chunks = []
-    for i in range(0, len(words), max_words):
-        chunk = " ".join(words[i : i + max_words])
-        if chunk:
-            chunks.append(chunk)
-    return chunks
+def embed_search_records(company_name: str, records: list[dict]) -> int:
+    """
+    Chunk each search record and sync the chunks into the company's own
+    ChromaDB namespace.
+
+    Records are dicts with a `text` key and optional `url`, `title` and
+    `category`. Chunks are sentence-aligned windows of CHUNK_MAX_TOKENS tokens
+    overlapping by CHUNK_OVERLAP_TOKENS, and each carries its provenance as
+    metadata {company, source, url, title, category, chunk_index, char_start,
+    char_end}, so retrieval can filter by category.
 
+    Re-researching a company only embeds chunks that were never stored before
+    and deletes chunks that no longer appear (see sync_documents). At most
+    NAMESPACE_MAX_CHUNKS chunks are kept per company.
 
-def clear_collection() -> None:
-    """Delete all documents from the collection."""
-    collection = get_collection()
-    result = collection.get(include=[])
-    if result["ids"]:
-        collection.delete(ids=result["ids"])
+    Returns the total number of chunks stored for the company.
+    """
+    documents, metadatas = [], []
+    for record in records:
+        for chunk in iter_chunks(record["text"]):
+            documents.append(chunk.text)
+            metadatas.append({
+                "company": company_name,
+                "source": "web_search",
+                "url": record.get("url") or "",
+                "title": record.get("title") or "",
+                "category": record.get("category") or "default",
+                "chunk_index": chunk.index,
+                "char_start": chunk.start,
+                "char_end": chunk.end,
+            })
+    return sync_documents(company_name, documents, metadatas)["total"]
 
 
 def embed_search_results(company_name: str, search_texts: list[str]) -> int:
-    """
-    Chunk each text at 250 words, embed all chunks, and store in ChromaDB
-    with metadata {company, source}.
+    """embed_search_records for bare texts whose URL and category are unknown."""
+    return embed_search_records(company_name, [{"text": text} for text in search_texts])
 
-    Returns the total number of chunks embedded.
-    """
-    collection = get_collection()
-    company_key = company_name.lower().replace(" ", "_")
-    all_chunks = []
-    all_metadatas = []
-    all_ids = []
-
-    chunk_index = 0
-    for text in search_texts:
-        for chunk in chunk_text(text):
-            all_chunks.append(chunk)
-            all_metadatas.append({"company": company_name, "source": "web_search"})
-            all_ids.append(f"{company_key}_chunk_{chunk_index}")
-            chunk_index += 1
-
-    if all_chunks:
-        collection.upsert(documents=all_chunks, metadatas=all_metadatas, ids=all_ids)
-
-    return len(all_chunks)
-
-
-def add_documents(texts: list[str], metadatas: list[dict]) -> None:
-    collection = get_collection()
-    ids = [f"doc_{i}" for i in range(len(texts))]
-    collection.add(documents=texts, metadatas=metadatas, ids=ids)
+
+def add_documents(company_name: str, texts: list[str], metadatas: list[dict]) -> None:
+    collection = get_collection(company_name)
+    ids = [content_hash(t) for t in texts]
+    collection.upsert(
+        documents=texts, metadatas=metadatas, ids=ids, embeddings=_embed_with_cache(texts, ids)
+    )
+    get_registry().record_ingest(collection.name, company_name, collection.count())
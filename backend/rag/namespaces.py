@@ -0,0 +1,187 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    from core.keys import normalize_company_name
+except ModuleNotFoundError:
+    from backend.core.keys import normalize_company_name
+
+# A namespace nobody has read or written for this long is dropped.
+NAMESPACE_TTL_S = float(os.getenv("NAMESPACE_TTL_S", str(3 * 24 * 60 * 60)))
+# Whole namespaces are evicted least recently used first past either cap.
+NAMESPACE_MAX_COUNT = int(os.getenv("NAMESPACE_MAX_COUNT", "200"))
+NAMESPACE_MAX_TOTAL_CHUNKS = int(os.getenv("NAMESPACE_MAX_TOTAL_CHUNKS", "50000"))
+# Chunks kept per company; anything beyond is not ingested.
+NAMESPACE_MAX_CHUNKS = int(os.getenv("NAMESPACE_MAX_CHUNKS", "1000"))
+
+# How long each research category's chunks stay current before a refresh
+# searches that category again. News moves daily; culture and interview
+# write-ups change on the order of a month.
+_DEFAULT_CATEGORY_TTLS = {
+    "news": 24 * 60 * 60,
+    "financials": 7 * 24 * 60 * 60,
+    "tech": 14 * 24 * 60 * 60,
+    "culture": 30 * 24 * 60 * 60,
+    "interviews": 30 * 24 * 60 * 60,
+    "default": 7 * 24 * 60 * 60,
+}
+
+
+def _load_category_ttls() -> dict[str, float]:
+    """Read per-category overrides from CORPUS_TTL_<CATEGORY> env vars."""
+    return {
+        category: float(os.getenv(f"CORPUS_TTL_{category.upper()}", default))
+        for category, default in _DEFAULT_CATEGORY_TTLS.items()
+    }
+
+
+CATEGORY_TTLS = _load_category_ttls()
+
+
+def collection_name_for(company_name: str, embedder_name: str = "") -> str:
+    """ChromaDB collection name holding one company's vectors for one embedder.
+
+    Chroma names are limited to [a-zA-Z0-9._-]; the hash suffix keeps names
+    unique when non-ASCII company names collapse to the same slug, and keeps
+    vectors from different embedding backends in separate collections.
+    """
+    key = normalize_company_name(company_name)
+    slug = re.sub(r"[^a-z0-9_]", "", key)[:48]
+    digest = hashlib.sha1(f"{key}|{embedder_name}".encode("utf-8")).hexdigest()[:10]
+    return f"company_{slug}_{digest}" if slug else f"company_{digest}"
+
+
+@dataclass
+class Namespace:
+    collection_name: str
+    company_name: str
+    chunk_count: int
+    accessed_at: float
+    ingested_at: float
+    version: int
+
+    @property
+    def is_expired(self) -> bool:
+        return time.time() - self.accessed_at > NAMESPACE_TTL_S
+
+
+class NamespaceRegistry:
+    """Bookkeeping for per-company vector namespaces.
+
+    Tracks chunk counts, last access and an ingestion version per namespace so
+    expiry and LRU eviction can drop whole companies without scanning the
+    vector store, and when each research category was last searched so a
+    refresh only repeats the stale ones.
+    """
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS namespaces ("
+            " collection_name TEXT PRIMARY KEY,"
+            " company_name TEXT NOT NULL,"
+            " chunk_count INTEGER NOT NULL DEFAULT 0,"
+            " accessed_at REAL NOT NULL,"
+            " ingested_at REAL NOT NULL,"
+            " version INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS category_refreshes ("
+            " collection_name TEXT NOT NULL,"
+            " category TEXT NOT NULL,"
+            " refreshed_at REAL NOT NULL,"
+            " PRIMARY KEY (collection_name, category))"
+        )
+
+    def get(self, collection_name: str) -> Optional[Namespace]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT collection_name, company_name, chunk_count, accessed_at, ingested_at, version"
+                " FROM namespaces WHERE collection_name = ?",
+                (collection_name,),
+            ).fetchone()
+        return Namespace(*row) if row else None
+
+    def touch(self, collection_name: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE namespaces SET accessed_at = ? WHERE collection_name = ?",
+                (time.time(), collection_name),
+            )
+
+    def record_ingest(self, collection_name: str, company_name: str, chunk_count: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO namespaces"
+                " (collection_name, company_name, chunk_count, accessed_at, ingested_at, version)"
+                " VALUES (?, ?, ?, ?, ?, 1)"
+                " ON CONFLICT(collection_name) DO UPDATE SET"
+                " company_name = excluded.company_name, chunk_count = excluded.chunk_count,"
+                " accessed_at = excluded.accessed_at, ingested_at = excluded.ingested_at,"
+                " version = namespaces.version + 1",
+                (collection_name, company_name, chunk_count, now, now),
+            )
+
+    def record_refresh(self, collection_name: str, categories: list[str]) -> None:
+        """Mark categories as searched just now for a namespace."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO category_refreshes (collection_name, category, refreshed_at)"
+                " VALUES (?, ?, ?)",
+                [(collection_name, category, now) for category in categories],
+            )
+
+    def refreshed_at(self, collection_name: str) -> dict[str, float]:
+        """When each category of a namespace was last searched."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT category, refreshed_at FROM category_refreshes WHERE collection_name = ?",
+                (collection_name,),
+            ).fetchall()
+        return dict(rows)
+
+    def remove(self, collection_name: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM namespaces WHERE collection_name = ?", (collection_name,))
+            self._conn.execute("DELETE FROM category_refreshes WHERE collection_name = ?", (collection_name,))
+
+    def eviction_candidates(self, keep: str = "") -> list[str]:
+        """Namespaces to drop: every expired one, then LRU ones until under the caps."""
+        cutoff = time.time() - NAMESPACE_TTL_S
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT collection_name, chunk_count, accessed_at FROM namespaces"
+                " ORDER BY accessed_at ASC"
+            ).fetchall()
+        count = len(rows)
+        total_chunks = sum(r[1] for r in rows)
+        victims = []
+        for name, chunk_count, accessed_at in rows:
+            if name == keep:
+                continue
+            over_cap = count > NAMESPACE_MAX_COUNT or total_chunks > NAMESPACE_MAX_TOTAL_CHUNKS
+            if accessed_at >= cutoff and not over_cap:
+                continue
+            victims.append(name)
+            count -= 1
+            total_chunks -= chunk_count
+        return victims
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, chunks = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(chunk_count), 0) FROM namespaces"
+            ).fetchone()
+        return {"namespaces": count, "chunks": chunks}
@@ -1,37 +1,123 @@
-from .embeddings import get_collection
+import logging
+import os
+import time
+from typing import Optional
 
+from .bm25 import BM25Index, get_bm25_store, reciprocal_rank_fusion
+from .embedders import get_embedder
+from .embeddings import get_collection, get_namespace
 
-def retrieve_context(query: str, k: int = 3, company_name: str = "") -> list[str]:
-    """Query ChromaDB and return the top-k most relevant document chunks.
+try:
+    from core.metrics import VECTOR_QUERY_SECONDS
+except ModuleNotFoundError:
+    from backend.core.metrics import VECTOR_QUERY_SECONDS
 
-    Args:
-        query: The search query string.
-        k: Number of chunks to retrieve (default 3).
-        company_name: When provided, restricts results to chunks stored under
-                      this company via ChromaDB metadata filtering.  This
-                      prevents cross-company contamination when multiple
-                      searches have been run in the same session.
+logger = logging.getLogger(__name__)
+
+# "hybrid" fuses BM25 and vector rankings; "dense" is vector search only.
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid").lower()
+# How deep each retriever looks before fusion.
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", "20"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+
+def _bm25_index(company_name: str, version: int) -> BM25Index:
+    collection = get_collection(company_name)
+    store = get_bm25_store()
+    index = store.get(collection.name, version)
+    if index is None:
+        # Built by another worker, or this process restarted since ingestion.
+        result = collection.get(include=["documents", "metadatas"])
+        categories = [(meta or {}).get("category") for meta in result["metadatas"] or []]
+        index = store.put(collection.name, version, result["ids"], result["documents"] or [], categories)
+    return index
+
+
+def hybrid_retrieve(
+    query: str,
+    company_name: str,
+    k: int = 3,
+    candidates: int = RETRIEVAL_CANDIDATES,
+    category: Optional[str] = None,
+    query_embedding: Optional[list[float]] = None,
+) -> tuple[list[str], dict]:
+    """Retrieve the top-k chunks for a company by fusing vector and BM25 rankings.
+
+    Both retrievers return up to `candidates` results, which are merged with
+    reciprocal rank fusion. With RETRIEVAL_MODE=dense only the vector ranking
+    is used. Given a `category` (news, culture, tech, financials, interviews),
+    both retrievers only consider chunks from that research category. A
+    precomputed `query_embedding` saves embedding the query again.
 
     Returns:
-        A list of document chunk strings, or an empty list if none found.
+        (documents, timings) where timings holds per-stage latency in ms.
     """
-    collection = get_collection()
-    if collection.count() == 0:
-        return []
-
-    query_kwargs: dict = {
-        "query_texts": [query],
-        "n_results": min(k, collection.count()),
-    }
-    if company_name:
-        query_kwargs["where"] = {"company": company_name}
+    timings = {}
+    t0 = time.perf_counter()
+    namespace = get_namespace(company_name) if company_name else None
+    if namespace is None or namespace.chunk_count == 0:
+        return [], timings
+    depth = min(max(candidates, k), namespace.chunk_count)
 
+    t = time.perf_counter()
     try:
-        results = collection.query(**query_kwargs)
+        dense = get_collection(company_name).query(
+            query_embeddings=[query_embedding if query_embedding is not None else get_embedder().embed_query(query)],
+            n_results=depth,
+            where={"category": category} if category else None,
+            include=["documents"],
+        )
     except Exception:
-        # where filter raises ValueError when no docs match the company filter.
-        # Return empty — do NOT fall back to unfiltered retrieval.
-        return []
+        # The namespace was evicted or emptied between the lookup and the query.
+        return [], timings
+    dense_ids = dense.get("ids", [[]])[0]
+    texts = dict(zip(dense_ids, dense.get("documents", [[]])[0]))
+    timings["vector_ms"] = round((time.perf_counter() - t) * 1000, 2)
+
+    if RETRIEVAL_MODE == "dense":
+        ranked = dense_ids
+    else:
+        t = time.perf_counter()
+        lexical = _bm25_index(company_name, namespace.version).search(query, depth, category)
+        timings["bm25_ms"] = round((time.perf_counter() - t) * 1000, 2)
+        for doc_id, doc, _ in lexical:
+            texts.setdefault(doc_id, doc)
 
-    documents = results.get("documents", [[]])[0]
-    return documents if documents else []
+        t = time.perf_counter()
+        ranked = reciprocal_rank_fusion([dense_ids, [doc_id for doc_id, _, _ in lexical]], k=RRF_K)
+        timings["fusion_ms"] = round((time.perf_counter() - t) * 1000, 2)
+
+    documents = [texts[doc_id] for doc_id in ranked[:k] if texts.get(doc_id)]
+    timings["total_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+    for name, ms in timings.items():
+        VECTOR_QUERY_SECONDS.labels(name[: -len("_ms")]).observe(ms / 1000)
+    return documents, timings
+
+
+def retrieve_context(
+    query: str,
+    k: int = 3,
+    company_name: str = "",
+    category: Optional[str] = None,
+    query_embedding: Optional[list[float]] = None,
+) -> list[str]:
+    """Return the top-k most relevant chunks from a company's namespace.
+
+    Args:
+        query: The search query string.
+        k: Number of chunks to retrieve (default 3).
+        company_name: The company whose namespace is searched. Each company's
+                      chunks live in their own collection, so results can
+                      never mix companies researched in the same session.
+        category: Only return chunks found by this research category.
+        query_embedding: The query's embedding, if the caller already has it.
+
+    Returns:
+        A list of document chunk strings, or an empty list if none found.
+    """
+    documents, timings = hybrid_retrieve(
+        query, company_name, k=k, category=category, query_embedding=query_embedding
+    )
+    if timings:
+        logger.info("Retrieval for '%s' (%s): %s", company_name, RETRIEVAL_MODE, timings)
+    return documents
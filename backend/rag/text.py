@@ -0,0 +1,10 @@
+import re
+
+# Keeps tokens like "c++", "c#", "node.js" and "series-b" intact.
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#._-]*")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens shared by the lexical index and the hashing embedder."""
+    tokens = (t.rstrip("._-") for t in _TOKEN_RE.findall(text.lower()))
+    return [t for t in tokens if t]
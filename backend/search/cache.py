@@ -0,0 +1,141 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+try:
+    from core.metrics import record_cache_lookup
+except ModuleNotFoundError:
+    from backend.core.metrics import record_cache_lookup
+
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", "./cache/search_cache.db")
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+
+# Default freshness per search category, in seconds. News goes stale within
+# hours; culture and interview write-ups change on the order of weeks.
+_DEFAULT_TTLS = {
+    "news": 60 * 60,
+    "financials": 6 * 60 * 60,
+    "tech": 3 * 24 * 60 * 60,
+    "culture": 7 * 24 * 60 * 60,
+    "interviews": 7 * 24 * 60 * 60,
+    "default": 24 * 60 * 60,
+}
+
+
+def _load_ttls() -> dict[str, float]:
+    """Read per-category TTL overrides from SEARCH_CACHE_TTL_<CATEGORY> env vars."""
+    return {
+        category: float(os.getenv(f"SEARCH_CACHE_TTL_{category.upper()}", default))
+        for category, default in _DEFAULT_TTLS.items()
+    }
+
+
+class SearchCache:
+    """Persistent SQLite cache of web search results.
+
+    Entries are keyed by the normalized query plus max_results, expire after
+    the TTL of the category they were stored under, and are evicted least
+    recently used first once the table grows past max_entries.
+    """
+
+    def __init__(self, path: str, max_entries: int, ttls: dict[str, float]):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_entries = max_entries
+        self.ttls = ttls
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            " key TEXT PRIMARY KEY,"
+            " category TEXT NOT NULL,"
+            " results TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_search_cache_accessed ON search_cache (accessed_at)"
+        )
+
+    @staticmethod
+    def make_key(query: str, max_results: int) -> str:
+        normalized = " ".join(query.lower().split())
+        return f"{normalized}|{max_results}"
+
+    def ttl_for(self, category: str) -> float:
+        return self.ttls.get(category, self.ttls["default"])
+
+    def get(self, query: str, max_results: int) -> Optional[list[dict]]:
+        """Return cached results, or None on a miss or an expired entry."""
+        key = self.make_key(query, max_results)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT category, results, created_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                record_cache_lookup("search", hit=False)
+                return None
+            category, results, created_at = row
+            if now - created_at > self.ttl_for(category):
+                self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self.misses += 1
+                record_cache_lookup("search", hit=False)
+                return None
+            self._conn.execute("UPDATE search_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        record_cache_lookup("search", hit=True)
+        return json.loads(results)
+
+    def set(self, query: str, max_results: int, category: str, results: list[dict]) -> None:
+        key = self.make_key(query, max_results)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, category, results, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, category, json.dumps(results), now, now),
+            )
+            evicted = self._conn.execute(
+                "DELETE FROM search_cache WHERE key IN ("
+                " SELECT key FROM search_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            self.evictions += max(evicted, 0)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Return the process-wide search cache, or None when SEARCH_CACHE_ENABLED is off."""
+    global _cache
+    if not SEARCH_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SearchCache(SEARCH_CACHE_PATH, SEARCH_CACHE_MAX_ENTRIES, _load_ttls())
+    return _cache
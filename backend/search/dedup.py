@@ -0,0 +1,138 @@
+import hashlib
+import os
+import re
+from collections import defaultdict
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import numpy as np
+
+# Two results whose 64-bit SimHashes differ in at most this many bits are
+# near-duplicates (syndicated copies, lightly edited reposts).
+SEARCH_NEAR_DUP_MAX_DISTANCE = int(os.getenv("SEARCH_NEAR_DUP_MAX_DISTANCE", "3"))
+
+SIMHASH_BITS = 64
+
+_TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "referrer", "source", "cmpid", "ncid", "guccounter",
+    "_ga", "_gl", "si", "spm",
+}
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """Key under which URL variants of the same page collide.
+
+    Scheme, a leading "www.", default ports, fragments, tracking parameters,
+    query parameter order and trailing slashes are ignored.
+    """
+    url = url.strip()
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url if "//" in url else f"//{url}")
+        port = parts.port
+    except ValueError:
+        return url.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if port and port != _DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{port}"
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/")
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+    )
+    return f"{host}{path}" + (f"?{urlencode(query)}" if query else "")
+
+
+def _features(text: str) -> list[str]:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < 2:
+        return words
+    return [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+_BIT_SHIFTS = np.arange(SIMHASH_BITS, dtype=np.uint64)
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word bigrams; similar texts get hashes a few bits apart."""
+    features = _features(text)
+    if not features:
+        return 0
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little") for f in features),
+        dtype=np.uint64,
+        count=len(features),
+    )
+    bits = (hashes[:, None] >> _BIT_SHIFTS) & np.uint64(1)
+    votes = 2 * bits.sum(axis=0, dtype=np.int64) - len(features)
+    return sum(1 << bit for bit in np.flatnonzero(votes > 0).tolist())
+
+
+class NearDuplicateIndex:
+    """SimHash index answering "is this within max_distance bits of anything seen?".
+
+    Hashes are split into max_distance + 1 bands; by the pigeonhole principle
+    two hashes within max_distance bits agree exactly on at least one band,
+    so only hashes sharing a band bucket are compared. Over a result set this
+    keeps deduplication linear instead of all-pairs.
+    """
+
+    def __init__(self, max_distance: int = SEARCH_NEAR_DUP_MAX_DISTANCE):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        width = SIMHASH_BITS // bands
+        self._bands = [
+            (start, ((1 << (SIMHASH_BITS - start if i == bands - 1 else width)) - 1))
+            for i, start in enumerate(range(0, width * bands, width))
+        ]
+        self._buckets: list[dict[int, list[int]]] = [defaultdict(list) for _ in self._bands]
+
+    def _keys(self, h: int) -> list[int]:
+        return [h >> start & mask for start, mask in self._bands]
+
+    def is_near_duplicate(self, h: int) -> bool:
+        for bucket, key in zip(self._buckets, self._keys(h)):
+            for other in bucket.get(key, ()):
+                if bin(h ^ other).count("1") <= self.max_distance:
+                    return True
+        return False
+
+    def add(self, h: int) -> None:
+        for bucket, key in zip(self._buckets, self._keys(h)):
+            bucket[key].append(h)
+
+
+def dedup_results(results: list[dict], max_distance: int = SEARCH_NEAR_DUP_MAX_DISTANCE) -> tuple[list[dict], dict]:
+    """Drop empty, same-page and near-duplicate results, keeping the first of each.
+
+    Returns:
+        (kept_results, stats) where stats counts what each stage removed.
+    """
+    seen_urls = set()
+    index = NearDuplicateIndex(max_distance)
+    kept = []
+    stats = {"input": len(results), "empty": 0, "url_duplicates": 0, "near_duplicates": 0}
+    for r in results:
+        text = f"{r.get('title', '').strip()} {r.get('snippet', '').strip()}".strip()
+        if not text:
+            stats["empty"] += 1
+            continue
+        url = canonicalize_url(r.get("url", ""))
+        if url:
+            if url in seen_urls:
+                stats["url_duplicates"] += 1
+                continue
+            seen_urls.add(url)
+        h = simhash(text)
+        if index.is_near_duplicate(h):
+            stats["near_duplicates"] += 1
+            continue
+        index.add(h)
+        kept.append(r)
+    stats["kept"] = len(kept)
+    return kept, stats
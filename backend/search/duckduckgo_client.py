@@ -1,75 +1,249 @@
+import asyncio
+import logging
 import os
-from tavily import TavilyClient
+import threading
+import time
+import weakref
+
+import httpx
+from tavily import AsyncTavilyClient, TavilyClient
 from dotenv import load_dotenv
 
+from .cache import get_search_cache
+from .dedup import dedup_results
+from .rate_limiter import get_search_limiter
+
+try:
+    from core.cassette import create_async_http_client, create_requests_session
+    from core.concurrency import run_blocking
+    from core.metrics import SEARCH_SECONDS
+except ModuleNotFoundError:
+    from backend.core.cassette import create_async_http_client, create_requests_session
+    from backend.core.concurrency import run_blocking
+    from backend.core.metrics import SEARCH_SECONDS
+
 load_dotenv()
 
-_client = TavilyClient(api_key=os.getenv("TAVILY"))
+logger = logging.getLogger(__name__)
+
+SEARCH_TIMEOUT_S = float(os.getenv("SEARCH_TIMEOUT_S", "15"))
+SEARCH_MAX_CONNECTIONS = int(os.getenv("SEARCH_MAX_CONNECTIONS", "20"))
+# Overridable so benchmarks can point searches at a local stand-in.
+TAVILY_BASE_URL = os.getenv("TAVILY_BASE_URL", "https://api.tavily.com")
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> TavilyClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = TavilyClient(
+                    api_key=os.getenv("TAVILY"), api_base_url=TAVILY_BASE_URL, session=create_requests_session()
+                )
+    return _client
 
 
-def search_web(query: str, max_results: int = 5) -> list[dict]:
+# One pooled async client per event loop: httpx connection pools cannot be
+# shared across loops, and entries disappear with the loop that owns them.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, tuple[AsyncTavilyClient, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_async_client() -> AsyncTavilyClient:
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None:
+        http_client = create_async_http_client(
+            base_url=TAVILY_BASE_URL,
+            timeout=SEARCH_TIMEOUT_S,
+            limits=httpx.Limits(
+                max_connections=SEARCH_MAX_CONNECTIONS,
+                max_keepalive_connections=SEARCH_MAX_CONNECTIONS,
+            ),
+        )
+        entry = (
+            AsyncTavilyClient(api_key=os.getenv("TAVILY"), api_base_url=TAVILY_BASE_URL, client=http_client),
+            http_client,
+        )
+        _async_clients[loop] = entry
+    return entry[0]
+
+
+async def aclose_search_clients() -> None:
+    """Close the pooled async client bound to the running event loop, if any."""
+    entry = _async_clients.pop(asyncio.get_running_loop(), None)
+    if entry is not None:
+        await entry[1].aclose()
+
+
+def _parse_results(response: dict) -> list[dict]:
+    results = []
+    for r in response.get("results", []):
+        results.append({
+            "title": r.get("title", ""),
+            "snippet": r.get("content", ""),
+            "url": r.get("url", ""),
+        })
+    return results
+
+
+def _tag(results: list[dict], category: str, from_cache: bool = False) -> list[dict]:
+    """Label results with the research category that found them, for chunk provenance.
+
+    Results served from the search cache are also marked `from_cache`.
+    """
+    if from_cache:
+        return [{**r, "category": category, "from_cache": True} for r in results]
+    return [{**r, "category": category} for r in results]
+
+
+def search_web(query: str, max_results: int = 5, category: str = "default") -> list[dict]:
     """
     Search the web using Tavily.
-    Returns a list of dicts with keys: title, snippet, url.
-    Returns an empty list on any error.
+    Returns a list of dicts with keys: title, snippet, url, category.
+    Results are served from the persistent search cache when a fresh entry
+    exists; `category` selects the cache TTL. Returns an empty list on any error.
     """
+    cache = get_search_cache()
+    if cache is not None:
+        cached = cache.get(query, max_results)
+        if cached is not None:
+            return _tag(cached, category)
+    get_search_limiter().acquire()
+    t0 = time.perf_counter()
     try:
-        response = _client.search(query, max_results=max_results)
-        results = []
-        for r in response.get("results", []):
-            results.append({
-                "title": r.get("title", ""),
-                "snippet": r.get("content", ""),
-                "url": r.get("url", ""),
-            })
-        return results
+        response = _get_client().search(query, max_results=max_results, timeout=SEARCH_TIMEOUT_S)
+        results = _parse_results(response)
     except Exception as e:
-        print(f"[search_web] Error for '{query}': {e}")
+        SEARCH_SECONDS.labels(category, "error").observe(time.perf_counter() - t0)
+        logger.warning("search failed category=%s query=%r error=%r", category, query, e)
         return []
+    SEARCH_SECONDS.labels(category, "ok" if results else "empty").observe(time.perf_counter() - t0)
+    if cache is not None and results:
+        cache.set(query, max_results, category, results)
+    return _tag(results, category)
+
+
+async def asearch_web(
+    query: str, max_results: int = 5, category: str = "default", use_cache: bool = True
+) -> list[dict]:
+    """
+    Async variant of search_web over a pooled HTTP connection.
+    Each call is bounded by SEARCH_TIMEOUT_S, and cache reads and writes run
+    through run_blocking. Cache hits are marked `from_cache`; with
+    `use_cache=False` the cache is not read, only refreshed with the new
+    results. Returns an empty list on any error.
+    """
+    cache = get_search_cache()
+    if cache is not None and use_cache:
+        cached = await run_blocking(cache.get, query, max_results)
+        if cached is not None:
+            return _tag(cached, category, from_cache=True)
+    await get_search_limiter().acquire_async()
+    t0 = time.perf_counter()
+    try:
+        response = await asyncio.wait_for(
+            _get_async_client().search(query, max_results=max_results, timeout=SEARCH_TIMEOUT_S),
+            timeout=SEARCH_TIMEOUT_S,
+        )
+        results = _parse_results(response)
+    except Exception as e:
+        SEARCH_SECONDS.labels(category, "error").observe(time.perf_counter() - t0)
+        logger.warning("search failed category=%s query=%r error=%r", category, query, e)
+        return []
+    SEARCH_SECONDS.labels(category, "ok" if results else "empty").observe(time.perf_counter() - t0)
+    if cache is not None and results:
+        await run_blocking(cache.set, query, max_results, category, results)
+    return _tag(results, category)
 
 
 def search_news(company: str) -> list[dict]:
-    return search_web(f"{company} latest news", max_results=5)
+    return search_web(f"{company} latest news", max_results=5, category="news")
 
 
 def search_culture(company: str) -> list[dict]:
-    return search_web(f"{company} company culture values employees", max_results=5)
+    return search_web(f"{company} company culture values employees", max_results=5, category="culture")
 
 
 def search_tech(company: str) -> list[dict]:
-    return search_web(f"{company} tech stack engineering technology", max_results=5)
+    return search_web(f"{company} tech stack engineering technology", max_results=5, category="tech")
 
 
 def search_financials(company: str) -> list[dict]:
-    revenue = search_web(f"{company} annual revenue earnings financial results", max_results=3)
-    valuation = search_web(f"{company} market cap valuation stock price funding", max_results=3)
+    revenue = search_web(f"{company} annual revenue earnings financial results", max_results=3, category="financials")
+    valuation = search_web(f"{company} market cap valuation stock price funding", max_results=3, category="financials")
     return revenue + valuation
 
 
 def search_interviews(company: str) -> list[dict]:
-    glassdoor = search_web(f"{company} interview questions Glassdoor candidate experience", max_results=3)
-    leetcode = search_web(f"site:leetcode.com {company} interview questions experience", max_results=3)
+    glassdoor = search_web(f"{company} interview questions Glassdoor candidate experience", max_results=3, category="interviews")
+    leetcode = search_web(f"site:leetcode.com {company} interview questions experience", max_results=3, category="interviews")
     return glassdoor + leetcode
 
 
-def process_results(results: list[dict]) -> list[str]:
+async def asearch_news(company: str, use_cache: bool = True) -> list[dict]:
+    return await asearch_web(f"{company} latest news", max_results=5, category="news", use_cache=use_cache)
+
+
+async def asearch_culture(company: str, use_cache: bool = True) -> list[dict]:
+    return await asearch_web(f"{company} company culture values employees", max_results=5, category="culture", use_cache=use_cache)
+
+
+async def asearch_tech(company: str, use_cache: bool = True) -> list[dict]:
+    return await asearch_web(f"{company} tech stack engineering technology", max_results=5, category="tech", use_cache=use_cache)
+
+
+async def asearch_financials(company: str, use_cache: bool = True) -> list[dict]:
+    revenue, valuation = await asyncio.gather(
+        asearch_web(f"{company} annual revenue earnings financial results", max_results=3, category="financials", use_cache=use_cache),
+        asearch_web(f"{company} market cap valuation stock price funding", max_results=3, category="financials", use_cache=use_cache),
+    )
+    return revenue + valuation
+
+
+async def asearch_interviews(company: str, use_cache: bool = True) -> list[dict]:
+    glassdoor, leetcode = await asyncio.gather(
+        asearch_web(f"{company} interview questions Glassdoor candidate experience", max_results=3, category="interviews", use_cache=use_cache),
+        asearch_web(f"site:leetcode.com {company} interview questions experience", max_results=3, category="interviews", use_cache=use_cache),
+    )
+    return glassdoor + leetcode
+
+
+def process_records(results: list[dict]) -> tuple[list[dict], dict]:
     """
-    Deduplicate by URL, clean whitespace, and combine title + snippet into text chunks.
-    Returns a list of strings ready for embedding.
+    Drop URL variants and near-duplicate copies, clean whitespace, and combine
+    title + snippet into text records that keep their provenance.
+
+    Returns (records, stats): each record has keys text, title, url and
+    category; stats counts the results removed by each dedup stage.
     """
-    seen_urls = set()
-    chunks = []
-    for r in results:
-        url = r.get("url", "").strip()
-        if url in seen_urls:
-            continue
-        seen_urls.add(url)
+    kept, stats = dedup_results(results)
+    records = []
+    for r in kept:
         title = r.get("title", "").strip()
         snippet = r.get("snippet", "").strip()
         text = f"{title}. {snippet}".strip()
         if text and text != ".":
-            chunks.append(text)
-    return chunks
+            records.append({
+                "text": text,
+                "title": title,
+                "url": r.get("url", "").strip(),
+                "category": r.get("category", "default"),
+            })
+    return records, stats
+
+
+def process_results(results: list[dict]) -> list[str]:
+    """
+    Deduplicate, clean whitespace, and combine title + snippet into text chunks.
+    Returns a list of strings ready for embedding.
+    """
+    records, _ = process_records(results)
+    return [r["text"] for r in records]
 
 
 def search_company(company_name: str) -> list[dict]:
@@ -82,6 +256,17 @@ def search_company(company_name: str) -> list[dict]:
     return results
 
 
+async def asearch_company(company_name: str) -> list[dict]:
+    """Async variant of search_company: every category and sub-query runs concurrently."""
+    groups = await asyncio.gather(
+        asearch_news(company_name),
+        asearch_culture(company_name),
+        asearch_tech(company_name),
+        asearch_interviews(company_name),
+    )
+    return [r for group in groups for r in group]
+
+
 if __name__ == "__main__":
     hits = search_company("Stripe")
     print(f"Got {len(hits)} total results:\n")
@@ -0,0 +1,27 @@
+import os
+import threading
+
+try:
+    from core.rate_limit import TokenBucket
+except ModuleNotFoundError:
+    from backend.core.rate_limit import TokenBucket
+
+_search_limiter = None
+_search_limiter_lock = threading.Lock()
+
+
+def get_search_limiter() -> TokenBucket:
+    """Return the process-wide limiter guarding outbound search API calls.
+
+    Configured with SEARCH_RATE_LIMIT_PER_S (sustained calls per second) and
+    SEARCH_RATE_LIMIT_BURST (calls allowed back to back before throttling).
+    """
+    global _search_limiter
+    if _search_limiter is None:
+        with _search_limiter_lock:
+            if _search_limiter is None:
+                _search_limiter = TokenBucket(
+                    rate=float(os.getenv("SEARCH_RATE_LIMIT_PER_S", "5")),
+                    capacity=float(os.getenv("SEARCH_RATE_LIMIT_BURST", "7")),
+                )
+    return _search_limiter
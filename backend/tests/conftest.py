@@ -0,0 +1,21 @@
+import os
+import sys
+import tempfile
+
+# Settings are read at import time, so every store points at a scratch
+# directory before any backend module is imported.
+_DATA_DIR = tempfile.mkdtemp(prefix="research-tests-")
+os.environ.update({
+    "OPENAI_API_KEY": "test",
+    "TAVILY": "test",
+    "EMBEDDING_BACKEND": "hashing",
+    "CASSETTE_MODE": "off",
+    "CHROMA_PERSIST_DIR": os.path.join(_DATA_DIR, "chroma_db"),
+    "SEARCH_CACHE_PATH": os.path.join(_DATA_DIR, "search_cache.db"),
+    "EMBEDDING_CACHE_PATH": os.path.join(_DATA_DIR, "embedding_cache.db"),
+    "REPORT_CACHE_PATH": os.path.join(_DATA_DIR, "report_cache.db"),
+    "COMPANY_VALIDITY_CACHE_PATH": os.path.join(_DATA_DIR, "company_validity.db"),
+    "JOB_STORE_PATH": os.path.join(_DATA_DIR, "jobs.db"),
+})
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import pytest
+
+from jobs.store import FAILED, QUEUED, RUNNING, JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.db"), lease_s=60, max_attempts=2)
+
+
+def _expire(store, job_id):
+    store._conn.execute("UPDATE jobs SET started_at = ? WHERE id = ?", (time.time() - 120, job_id))
+
+
+def test_job_is_claimed_once(store):
+    job = store.create("Acme", 1)
+    assert store.claim(job.id)
+    assert not store.claim(job.id)
+    assert store.get(job.id).attempts == 1
+
+
+def test_unfinished_leaves_running_jobs_within_their_lease(store):
+    running = store.create("Acme", 1)
+    queued = store.create("Beta", 1)
+    store.claim(running.id)
+    assert [job.id for job in store.unfinished()] == [queued.id]
+    assert store.get(running.id).status == RUNNING
+
+
+def test_expired_jobs_are_requeued(store):
+    job = store.create("Acme", 1)
+    store.claim(job.id)
+    _expire(store, job.id)
+    assert [j.id for j in store.requeue_expired()] == [job.id]
+    assert store.get(job.id).status == QUEUED
+    assert store.requeue_expired() == []
+
+
+def test_job_out_of_attempts_is_failed(store):
+    job = store.create("Acme", 1)
+    for _ in range(2):
+        store.claim(job.id)
+        _expire(store, job.id)
+        store.unfinished()
+    assert store.get(job.id).status == FAILED
+    assert "2 attempts" in store.get(job.id).error
+    assert store.unfinished() == []
+
+
+def test_release_does_not_count_the_attempt(store):
+    job = store.create("Acme", 1)
+    store.claim(job.id)
+    store.release(job.id)
+    released = store.get(job.id)
+    assert (released.status, released.attempts) == (QUEUED, 0)
+
+
+def test_stopping_the_queue_hands_running_jobs_back(store):
+    from jobs.queue import JobQueue
+
+    async def scenario():
+        started = asyncio.Event()
+
+        async def runner(job):
+            started.set()
+            await asyncio.sleep(10)
+
+        queue = JobQueue(runner, store=store, workers=1)
+        await queue.start()
+        job = await queue.submit("Acme")
+        await started.wait()
+        await queue.stop()
+        return store.get(job.id)
+
+    job = asyncio.run(scenario())
+    assert (job.status, job.attempts) == (QUEUED, 0)
@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+import pytest
+
+import main
+import rag.embeddings
+
+CATEGORIES = ["news", "culture", "tech", "interviews", "financials"]
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    """A stored report with one record per category, and control over which categories are stale."""
+    entry = SimpleNamespace(
+        report="stored report",
+        records=[{"text": f"{c} text", "url": f"https://example.com/{c}", "category": c} for c in CATEGORIES],
+    )
+    store = SimpleNamespace(get=lambda company_name: entry)
+    stale = []
+    monkeypatch.setattr(main, "get_report_store", lambda: store)
+    monkeypatch.setattr(rag.embeddings, "stale_categories", lambda company_name, categories: list(stale))
+    return SimpleNamespace(entry=entry, store=store, stale=stale)
+
+
+def test_no_stored_report_researches_from_scratch(monkeypatch):
+    monkeypatch.setattr(main, "get_report_store", lambda: SimpleNamespace(get=lambda company_name: None))
+    assert main._refresh_plan("Acme") is None
+
+
+def test_defaults_to_stale_categories(stored):
+    stored.stale.extend(["news", "interviews"])
+    plan = main._refresh_plan("Acme")
+    assert plan["search_nodes"] == ["news", "interview"]
+    assert plan["base_records"] == stored.entry.records
+    assert plan["base_report"] == "stored report"
+
+
+def test_explicit_categories_override_staleness(stored):
+    stored.stale.append("news")
+    plan = main._refresh_plan("Acme", ["financials"])
+    assert plan["search_nodes"] == ["financials"]
+
+
+def test_empty_category_list_refreshes_nothing(stored):
+    stored.stale.extend(CATEGORIES)
+    plan = main._refresh_plan("Acme", [])
+    assert plan["search_nodes"] == []
+    assert len(plan["base_records"]) == len(CATEGORIES)
+
+
+def test_every_category_stale_rebuilds_from_new_searches(stored):
+    stored.stale.extend(CATEGORIES)
+    plan = main._refresh_plan("Acme")
+    assert plan == {
+        "search_nodes": ["news", "culture", "tech", "interview", "financials"],
+        "base_records": stored.entry.records,
+        "base_report": None,
+    }
+
+
+def test_unknown_category_is_rejected(stored):
+    with pytest.raises(ValueError, match="bogus"):
+        main._refresh_plan("Acme", ["news", "bogus"])
+
+
+def test_flight_key_separates_kinds_of_run():
+    plain = main._flight_key("Stripe, Inc.")
+    assert main._flight_key("stripe") == plain
+    assert main._flight_key("stripe", force_refresh=True) != plain
+    refresh = main._flight_key("stripe", refresh={"search_nodes": ["tech", "news"]})
+    assert refresh not in (plain, main._flight_key("stripe", force_refresh=True))
+    assert main._flight_key("stripe", refresh={"search_nodes": ["news", "tech"]}) == refresh
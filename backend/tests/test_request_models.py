@@ -0,0 +1,9 @@
+import pytest
+
+import main
+
+
+def test_chat_category_must_be_a_research_category():
+    assert main.ChatRequest(company_name="Acme", question="?", category="interviews").category == "interviews"
+    with pytest.raises(ValueError, match="interview"):
+        main.ChatRequest(company_name="Acme", question="?", category="interview")
@@ -0,0 +1,38 @@
+from agents.research_graph import aggregator_node, refreshed_categories
+
+
+def _record(category, text):
+    return {"text": text, "title": text, "url": f"https://example.com/{category}/{len(text)}", "category": category}
+
+
+def _state(fetched, tech_results):
+    return {
+        "company_name": "Acme",
+        "news_results": [],
+        "culture_results": [],
+        "tech_results": tech_results,
+        "interview_results": [],
+        "financials_results": [],
+        "search_nodes": ["tech"],
+        "base_records": [_record("news", "Acme ships a thing"), _record("tech", "Acme runs on Go")],
+        "fetched_categories": fetched,
+    }
+
+
+def test_failed_refresh_keeps_stored_records():
+    update = aggregator_node(_state([], []))
+    assert [r["text"] for r in update["all_records"]] == ["Acme ships a thing", "Acme runs on Go"]
+
+
+def test_fetched_category_replaces_stored_records():
+    results = [{"title": "Acme moves to Rust", "snippet": "", "url": "https://example.com/rust", "category": "tech"}]
+    update = aggregator_node(_state(["tech"], results))
+    assert [r["text"] for r in update["all_records"]] == ["Acme ships a thing", "Acme moves to Rust."]
+
+
+def test_refreshed_categories_follow_search_node_order():
+    assert refreshed_categories({"fetched_categories": ["financials", "news", "interviews"]}) == [
+        "news",
+        "interviews",
+        "financials",
+    ]
@@ -0,0 +1,105 @@
+import asyncio
+
+from core.singleflight import SingleFlight
+
+
+def test_same_key_shares_one_run():
+    async def scenario():
+        flights = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "report"
+
+        results = await asyncio.gather(*(flights.do("acme", work) for _ in range(3)))
+        return results, calls, flights.stats()
+
+    results, calls, stats = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert [shared for _, shared in results] == [False, True, True]
+    assert {result for result, _ in results} == {"report"}
+    assert stats == {"in_flight": 0, "started": 1, "coalesced": 2}
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        flights = SingleFlight()
+        calls = []
+
+        def work(key):
+            async def run():
+                calls.append(key)
+                await asyncio.sleep(0.01)
+                return key
+
+            return run
+
+        keys = ("acme", "acme|force", "acme|refresh:news")
+        results = await asyncio.gather(*(flights.do(key, work(key)) for key in keys))
+        return results, calls
+
+    results, calls = asyncio.run(scenario())
+    assert sorted(calls) == sorted(["acme", "acme|force", "acme|refresh:news"])
+    assert all(not shared for _, shared in results)
+
+
+def test_work_cancelled_only_after_last_waiter_leaves():
+    async def scenario():
+        flights = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        first = asyncio.ensure_future(flights.do("acme", work))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flights.do("acme", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        after_first = cancelled.is_set()
+        second.cancel()
+        await asyncio.sleep(0.01)
+        return after_first, cancelled.is_set(), flights.in_flight("acme")
+
+    after_first, after_both, in_flight = asyncio.run(scenario())
+    assert not after_first
+    assert after_both
+    assert not in_flight
+
+
+def test_caller_after_cancellation_starts_a_fresh_flight():
+    async def scenario():
+        flights = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                # Slow teardown, like closing HTTP clients.
+                await asyncio.sleep(0.05)
+                raise
+            return "stale"
+
+        async def quick():
+            calls.append(2)
+            return "fresh"
+
+        first = asyncio.ensure_future(flights.do("acme", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        result = await flights.do("acme", quick)
+        return result, calls
+
+    result, calls = asyncio.run(scenario())
+    assert result == ("fresh", False)
+    assert calls == [1, 2]
@@ -0,0 +1,26 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from rag.embeddings import get_collection, get_namespace, sync_documents
+
+
+def _docs(prefix, n):
+    docs = [f"{prefix} chunk {i} about Acme" for i in range(n)]
+    return docs, [{"category": prefix} for _ in docs]
+
+
+def test_concurrent_syncs_leave_one_consistent_corpus():
+    corpora = [_docs("news", 20), _docs("tech", 25)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda corpus: sync_documents("Concurrent Co", *corpus), corpora * 4))
+
+    stored = get_collection("Concurrent Co").get()
+    assert sorted(stored["documents"]) in [sorted(docs) for docs, _ in corpora]
+    assert get_namespace("Concurrent Co").chunk_count == len(stored["ids"])
+
+
+def test_changed_metadata_is_relabelled():
+    docs, _ = _docs("news", 3)
+    sync_documents("Relabel Co", docs, [{"category": "news"}] * 3)
+    stats = sync_documents("Relabel Co", docs, [{"category": "tech"}] * 3)
+    assert (stats["kept"], stats["relabelled"]) == (3, 3)
+    assert {m["category"] for m in get_collection("Relabel Co").get()["metadatas"]} == {"tech"}